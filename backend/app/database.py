@@ -1,10 +1,91 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import os
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
 
-DATABASE_URL = "sqlite+aiosqlite:////data/memories.db"
+from app.migrations import run_migrations
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:////data/memories.db")
+
+
+@dataclass(frozen=True)
+class SQLiteProfile:
+    """PRAGMAs applied to every new SQLite connection."""
+
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    busy_timeout_ms: int = 5000
+    mmap_size: int = 256 * 1024 * 1024
+    cache_size_kib: int = 16 * 1024
+    read_pool_size: int = 4
+
+
+def _env_profile() -> SQLiteProfile:
+    """Build the engine profile from SQLITE_* environment variables."""
+    default = SQLiteProfile()
+    return SQLiteProfile(
+        journal_mode=os.getenv("SQLITE_JOURNAL_MODE", default.journal_mode),
+        synchronous=os.getenv("SQLITE_SYNCHRONOUS", default.synchronous),
+        busy_timeout_ms=int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", default.busy_timeout_ms)),
+        mmap_size=int(os.getenv("SQLITE_MMAP_SIZE", default.mmap_size)),
+        cache_size_kib=int(os.getenv("SQLITE_CACHE_SIZE_KIB", default.cache_size_kib)),
+        read_pool_size=int(os.getenv("SQLITE_READ_POOL_SIZE", default.read_pool_size)),
+    )
+
+
+def _apply_profile(engine: AsyncEngine, profile: SQLiteProfile, read_only: bool) -> None:
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_pragmas(dbapi_conn, _record) -> None:
+        cursor = dbapi_conn.cursor()
+        # journal_mode is persistent in the file and needs a write lock
+        if not read_only:
+            cursor.execute(f"PRAGMA journal_mode={profile.journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={profile.synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={profile.busy_timeout_ms}")
+        cursor.execute(f"PRAGMA mmap_size={profile.mmap_size}")
+        cursor.execute(f"PRAGMA cache_size=-{profile.cache_size_kib}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+
+def create_engines(
+    url: str, profile: SQLiteProfile | None
+) -> tuple[AsyncEngine, AsyncEngine]:
+    """Create the read-write engine and a separate read-only reader pool.
+
+    Without a profile, both are the same plain engine (driver defaults).
+    """
+    engine = create_async_engine(url, echo=False)
+    if profile is None:
+        return engine, engine
+    # Explicit pool class: on early SQLAlchemy 2.0.x aiosqlite defaults to
+    # NullPool for file databases, which rejects the size arguments
+    read_engine = create_async_engine(
+        url,
+        echo=False,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=profile.read_pool_size,
+        max_overflow=profile.read_pool_size,
+    )
+    _apply_profile(engine, profile, read_only=False)
+    _apply_profile(read_engine, profile, read_only=True)
+    return engine, read_engine
+
 
-engine = create_async_engine(DATABASE_URL, echo=False)
+PROFILE = _env_profile()
+engine, read_engine = create_engines(DATABASE_URL, PROFILE)
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+# Read-only endpoints use their own query_only connection pool
+async_read_session = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
 
 
 class Base(DeclarativeBase):
@@ -12,6 +93,7 @@ class Base(DeclarativeBase):
 
 
 async def init_db() -> None:
-    """Create all tables that don't exist yet."""
+    """Create all tables that don't exist yet, then migrate existing ones."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await run_migrations(conn)
@@ -3,7 +3,7 @@ import logging
 import os
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.database import init_db
@@ -17,6 +17,12 @@ from app.routers.stt import router as stt_router
 from app.routers.tts import router as tts_router
 from app.routers.whatsapp import router as whatsapp_router
 from app.services.cleanup_service import daily_cleanup_loop
+from app.services.flow_worker import start_workers as start_flow_workers
+from app.services.health_monitor import monitor as health_monitor
+from app.services.http_client import close_clients, open_clients
+from app.services.metrics import MetricsMiddleware, render as render_metrics
+from app.services.ollama_model import keep_model_loaded
+from app.services.timing import ServerTimingMiddleware
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,9 +36,19 @@ async def lifespan(app: FastAPI):
     logger.info("Initializing database...")
     await init_db()
     logger.info("Database ready")
+    await open_clients()
+    flow_workers = await start_flow_workers()
     cleanup_task = asyncio.create_task(daily_cleanup_loop())
+    health_task = asyncio.create_task(health_monitor.run())
+    model_task = asyncio.create_task(keep_model_loaded())
     yield
-    cleanup_task.cancel()
+    tasks = [model_task, health_task, cleanup_task, *flow_workers]
+    for task in tasks:
+        task.cancel()
+    # Let in-flight probes, keep-alive and n8n calls unwind before the
+    # clients close under them
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await close_clients()
 
 
 app = FastAPI(title="Memories Backend", version="0.5.0", lifespan=lifespan)
@@ -44,6 +60,8 @@ app.add_middleware(
     allow_methods=["GET", "POST", "PUT", "PATCH"],
     allow_headers=["Content-Type"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ServerTimingMiddleware)
 
 app.include_router(stt_router)
 app.include_router(tts_router)
@@ -63,5 +81,12 @@ async def health_simple() -> dict:
 
 @app.get("/api/health")
 async def health_detailed() -> dict:
-    """Deep health check — probes all downstream services in parallel."""
+    """Deep health check — cached results of the background prober."""
     return await health_check_all()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus metrics in text format."""
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
@@ -0,0 +1,37 @@
+"""Schema migrations for existing SQLite databases.
+
+create_all only creates missing tables; it never changes existing ones.
+Changes to existing tables are numbered steps below. PRAGMA user_version
+records the last step applied, so each step runs once per database.
+Steps must be idempotent (IF NOT EXISTS): on a fresh database create_all
+has already built the current schema.
+"""
+
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS: list[list[str]] = [
+    # 1: indexes for news listing/retention, flow queue and summary purge.
+    # published_at is deliberately not indexed: SQLite would pick it to skip
+    # the ORDER BY and scan the whole table, while sorting the small
+    # created_at window found via ix_news_articles_created_at is cheap.
+    [
+        "CREATE INDEX IF NOT EXISTS ix_news_articles_created_at ON news_articles (created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_flow_executions_status ON flow_executions (status)",
+        "CREATE INDEX IF NOT EXISTS ix_flow_executions_created_at ON flow_executions (created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_summary_cache_created_at ON summary_cache (created_at)",
+    ],
+]
+
+
+async def run_migrations(conn: AsyncConnection) -> None:
+    """Apply all migration steps newer than the database's user_version."""
+    version = (await conn.exec_driver_sql("PRAGMA user_version")).scalar_one()
+    for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+        for sql in statements:
+            await conn.exec_driver_sql(sql)
+        await conn.exec_driver_sql(f"PRAGMA user_version = {number}")
+        logger.info("Applied database migration %d", number)
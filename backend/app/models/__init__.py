@@ -1,3 +1,5 @@
+from app.models.flow import FlowExecution
 from app.models.news import NewsArticle, NewsPreferences
+from app.models.summary import SummaryCache
 
-__all__ = ["NewsArticle", "NewsPreferences"]
+__all__ = ["FlowExecution", "NewsArticle", "NewsPreferences", "SummaryCache"]
@@ -27,7 +27,7 @@ class NewsArticle(Base):
     audio_parkiet: Mapped[str | None] = mapped_column(String(500), nullable=True)
     published_at: Mapped[datetime] = mapped_column()
     rendered_at: Mapped[datetime | None] = mapped_column(nullable=True)
-    created_at: Mapped[datetime] = mapped_column(default=_utcnow)
+    created_at: Mapped[datetime] = mapped_column(default=_utcnow, index=True)
 
 
 class NewsPreferences(Base):
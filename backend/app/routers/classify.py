@@ -1,7 +1,7 @@
 from fastapi import APIRouter
 
 from app.schemas.flow import ClassifyRequest, ClassifyResponse
-from app.services.classify_service import classify
+from app.services.classify_service import cache_stats, classify, prefix_stats
 
 router = APIRouter()
 
@@ -11,3 +11,9 @@ async def classify_endpoint(req: ClassifyRequest) -> ClassifyResponse:
     """Classify a Dutch transcription into an intent with parameters."""
     result = await classify(req.text)
     return ClassifyResponse(**result)
+
+
+@router.get("/api/classify/stats")
+async def classify_stats() -> dict:
+    """Hit/miss counters of the classification cache, prompt-prefix state."""
+    return {**cache_stats(), "prefix": prefix_stats()}
@@ -1,20 +1,27 @@
-import json
+import asyncio
+from collections.abc import AsyncIterator
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 
-from app.database import async_session
+from app.database import async_read_session, async_session
+from app.routers.sse import SSE_HEADERS, SSE_KEEPALIVE, sse_event
 from app.schemas.flow import FlowExecuteRequest, FlowExecuteResponse, FlowStatusResponse
-from app.services.flow_service import create_execution, execute_flow, get_execution
+from app.services.flow_events import TERMINAL_STATUSES, bus
+from app.services.flow_service import create_execution, get_execution, to_status
+from app.services.flow_worker import enqueue
+
+KEEPALIVE_INTERVAL = 15
 
 router = APIRouter(prefix="/api/flow")
 
 
 @router.post("/execute", response_model=FlowExecuteResponse)
 async def execute_endpoint(req: FlowExecuteRequest) -> FlowExecuteResponse:
-    """Create and execute a flow. Returns execution ID for status polling."""
+    """Queue a flow for execution. Returns execution ID for status polling."""
     async with async_session() as session:
         execution = await create_execution(session, req.intent, req.params, req.source_text)
-        execution = await execute_flow(session, execution.id)
+        enqueue(execution.id)
         return FlowExecuteResponse(
             execution_id=execution.id,
             status=execution.status,
@@ -25,16 +32,47 @@ async def execute_endpoint(req: FlowExecuteRequest) -> FlowExecuteResponse:
 @router.get("/status/{execution_id}", response_model=FlowStatusResponse)
 async def status_endpoint(execution_id: str) -> FlowStatusResponse:
     """Poll the status of a flow execution."""
-    async with async_session() as session:
+    async with async_read_session() as session:
         execution = await get_execution(session, execution_id)
         if not execution:
             raise HTTPException(status_code=404, detail="Uitvoering niet gevonden")
-        return FlowStatusResponse(
-            execution_id=execution.id,
-            status=execution.status,
-            result=json.loads(execution.result_json) if execution.result_json else None,
-            error=execution.error,
-        )
+        return to_status(execution)
+
+
+@router.get("/status/{execution_id}/events")
+async def status_events(execution_id: str, request: Request) -> StreamingResponse:
+    """Push status updates as Server-Sent Events until the flow finishes."""
+    # Subscribe before reading the current state so no transition is missed
+    queue = bus.subscribe(execution_id)
+    try:
+        async with async_read_session() as session:
+            execution = await get_execution(session, execution_id)
+        if not execution:
+            raise HTTPException(status_code=404, detail="Uitvoering niet gevonden")
+    except BaseException:
+        bus.unsubscribe(execution_id, queue)
+        raise
+
+    async def events(current: FlowStatusResponse) -> AsyncIterator[str]:
+        try:
+            yield sse_event("status", current.model_dump())
+            while current.status not in TERMINAL_STATUSES:
+                try:
+                    update = await asyncio.wait_for(queue.get(), KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield SSE_KEEPALIVE
+                    continue
+                if update.status != current.status:
+                    current = update
+                    yield sse_event("status", current.model_dump())
+        finally:
+            bus.unsubscribe(execution_id, queue)
+
+    return StreamingResponse(
+        events(to_status(execution)), media_type="text/event-stream", headers=SSE_HEADERS
+    )
 
 
 def _status_message(execution) -> str:
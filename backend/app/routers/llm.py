@@ -1,7 +1,22 @@
-from fastapi import APIRouter
+import logging
+from collections.abc import AsyncIterator
+
+import httpx
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from app.services.llm_service import chat, summarize
+from app.routers.sse import SSE_HEADERS, sse_event
+from app.services.llm_service import (
+    LLMStreamError,
+    chat,
+    chat_stream,
+    summarize,
+    summarize_stream,
+)
+from app.services.ollama_scheduler import scheduler
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -39,3 +54,47 @@ async def chat_endpoint(req: ChatRequest) -> ChatResponse:
     """Chat with the LLM using a conversation history."""
     reply = await chat([m.model_dump() for m in req.messages])
     return ChatResponse(reply=reply)
+
+
+async def _sse_tokens(tokens: AsyncIterator[str], request: Request) -> AsyncIterator[str]:
+    """Relay LLM tokens as SSE. Stops the upstream generation on disconnect."""
+    try:
+        async for token in tokens:
+            if await request.is_disconnected():
+                logger.info("Client disconnected, cancelling LLM stream")
+                return
+            yield sse_event(None, {"token": token})
+        yield sse_event("done", {})
+    except (httpx.HTTPError, LLMStreamError) as e:
+        logger.error("LLM stream failed: %s", e)
+        yield sse_event("error", {"detail": str(e) or "LLM-service niet beschikbaar"})
+    finally:
+        await tokens.aclose()
+
+
+def _sse_response(tokens: AsyncIterator[str], request: Request) -> StreamingResponse:
+    return StreamingResponse(
+        _sse_tokens(tokens, request),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+@router.post("/api/summarize/stream")
+async def summarize_stream_endpoint(req: SummarizeRequest, request: Request) -> StreamingResponse:
+    """Summarize an article, streaming tokens as Server-Sent Events."""
+    tokens = await summarize_stream(req.text)
+    return _sse_response(tokens, request)
+
+
+@router.post("/api/chat/stream")
+async def chat_stream_endpoint(req: ChatRequest, request: Request) -> StreamingResponse:
+    """Chat with the LLM, streaming the reply as Server-Sent Events."""
+    tokens = await chat_stream([m.model_dump() for m in req.messages])
+    return _sse_response(tokens, request)
+
+
+@router.get("/api/llm/queue")
+async def llm_queue() -> dict:
+    """Ollama scheduler usage and queue-wait time per priority class."""
+    return scheduler.stats()
@@ -1,34 +1,64 @@
+import asyncio
 import json
 import logging
 from datetime import date
 
 import httpx
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import FileResponse, Response, StreamingResponse
 
 logger = logging.getLogger(__name__)
 
-from app.database import async_session
+from app.database import async_read_session, async_session
 from app.schemas.news import (
+    BriefingResponse,
+    BriefingTrackResponse,
     NewsArticleResponse,
     NewsPreferencesRequest,
     NewsPreferencesResponse,
     NewsTodayResponse,
 )
+from app.services.cleanup_service import cleanup_status
+from app.services.http_client import get_client
 from app.services.news_service import (
+    BriefingTrack,
+    briefing_etag,
+    get_briefing,
     get_audio_path,
     get_preferences,
     get_today_articles,
+    today_cache,
+    today_expires_at,
     update_preferences,
 )
 
 router = APIRouter()
 
+# Read size when streaming the briefing from disk
+BRIEFING_CHUNK = 256 * 1024
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
 
 @router.get("/api/news/today", response_model=NewsTodayResponse)
-async def news_today() -> NewsTodayResponse:
-    """List today's news articles with audio status."""
-    async with async_session() as session:
+async def news_today(if_none_match: str | None = Header(default=None)) -> Response:
+    """List today's news articles with audio status.
+
+    Served from an in-process cache; a matching If-None-Match gets a 304.
+    """
+    body, etag = await today_cache.get(_build_today)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+async def _build_today() -> tuple[bytes, float]:
+    """Query and serialize the today list. Returns (body, expires_at)."""
+    async with async_read_session() as session:
         articles = await get_today_articles(session)
 
     items = []
@@ -53,18 +83,125 @@ async def news_today() -> NewsTodayResponse:
             )
         )
 
-    return NewsTodayResponse(
+    response = NewsTodayResponse(
         date=date.today().isoformat(),
         articles=items,
         total=len(items),
         audio_ready_count=sum(1 for i in items if i.audio_ready),
     )
+    return response.model_dump_json().encode(), today_expires_at(articles)
+
+
+@router.get("/api/news/briefing", response_model=BriefingResponse)
+async def news_briefing() -> BriefingResponse:
+    """Manifest of the briefing stream: byte offset and length per article."""
+    async with async_read_session() as session:
+        tracks = await get_briefing(session)
+
+    return BriefingResponse(
+        date=date.today().isoformat(),
+        etag=briefing_etag(tracks),
+        total_bytes=sum(t.length for t in tracks),
+        tracks=[
+            BriefingTrackResponse(
+                id=t.article.id,
+                source=t.article.source,
+                title=t.article.title,
+                audio_quality=t.quality,
+                published_at=t.article.published_at,
+                offset=t.offset,
+                length=t.length,
+            )
+            for t in tracks
+        ],
+    )
+
+
+def _parse_range(header: str, total: int) -> tuple[int, int] | None:
+    """Parse a single `bytes=` range into inclusive (start, end).
+
+    Returns None for anything we serve as a full response instead
+    (other units, multiple ranges, malformed specs).
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first:
+            start, end = int(first), int(last) if last else total - 1
+        else:
+            start, end = total - int(last), total - 1
+    except ValueError:
+        return None
+    start, end = max(start, 0), min(end, total - 1)
+    if start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Bereik niet beschikbaar",
+            headers={"Content-Range": f"bytes */{total}"},
+        )
+    return start, end
+
+
+async def _stream_tracks(tracks: list[BriefingTrack], start: int, end: int):
+    """Yield stream bytes start..end (inclusive), reading files in a worker thread."""
+    for t in tracks:
+        lo, hi = max(start, t.offset), min(end + 1, t.offset + t.length)
+        if lo >= hi:
+            continue
+        f = await asyncio.to_thread(t.path.open, "rb")
+        try:
+            await asyncio.to_thread(f.seek, t.start + lo - t.offset)
+            remaining = hi - lo
+            while remaining:
+                chunk = await asyncio.to_thread(f.read, min(BRIEFING_CHUNK, remaining))
+                if not chunk:
+                    raise OSError(f"{t.path} is shorter than when the briefing was listed")
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            f.close()
+
+
+@router.get("/api/news/briefing/audio")
+async def news_briefing_audio(
+    range_header: str | None = Header(default=None, alias="range"),
+    if_range: str | None = Header(default=None),
+) -> StreamingResponse:
+    """Stream all of today's rendered articles as one MP3, without re-encoding.
+
+    Track boundaries match the offsets in /api/news/briefing. Supports a
+    single byte range for seeking.
+    """
+    async with async_read_session() as session:
+        tracks = await get_briefing(session)
+    if not tracks:
+        raise HTTPException(status_code=404, detail="Audio niet beschikbaar")
+
+    total = sum(t.length for t in tracks)
+    etag = briefing_etag(tracks)
+    headers = {"Accept-Ranges": "bytes", "ETag": etag, "Cache-Control": "no-cache"}
+    span = None
+    if range_header and (if_range is None or if_range == etag):
+        span = _parse_range(range_header, total)
+    start, end = span or (0, total - 1)
+    headers["Content-Length"] = str(end - start + 1)
+    if span:
+        headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+
+    return StreamingResponse(
+        _stream_tracks(tracks, start, end),
+        status_code=206 if span else 200,
+        media_type="audio/mpeg",
+        headers=headers,
+    )
 
 
 @router.get("/api/news/{article_id}/audio")
 async def news_audio(article_id: str) -> FileResponse:
     """Stream the best available audio for a news article."""
-    async with async_session() as session:
+    async with async_read_session() as session:
         path = await get_audio_path(session, article_id)
 
     if not path:
@@ -77,6 +214,12 @@ async def news_audio(article_id: str) -> FileResponse:
     )
 
 
+@router.get("/api/news/cleanup")
+async def news_cleanup() -> dict:
+    """Retention cleanup schedule and what the last run reclaimed."""
+    return await cleanup_status()
+
+
 @router.put("/api/news/preferences", response_model=NewsPreferencesResponse)
 async def put_preferences(req: NewsPreferencesRequest) -> NewsPreferencesResponse:
     """Update news feed preferences."""
@@ -107,9 +250,8 @@ async def get_news_preferences() -> NewsPreferencesResponse:
 async def news_refresh() -> dict:
     """Trigger the n8n news-briefing workflow via webhook."""
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.post("http://n8n:5678/webhook/news-refresh")
-            resp.raise_for_status()
+        resp = await get_client("n8n").post("http://n8n:5678/webhook/news-refresh", timeout=10)
+        resp.raise_for_status()
     except httpx.RequestError as e:
         logger.warning("n8n webhook unreachable: %s", e)
         raise HTTPException(status_code=503, detail="n8n niet beschikbaar")
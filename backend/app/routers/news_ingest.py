@@ -6,7 +6,7 @@ from sqlalchemy import select
 from app.database import async_session
 from app.models.news import NewsArticle
 from app.schemas.news import NewsArticleCreate
-from app.services.news_service import create_article, save_audio
+from app.services.news_service import create_articles, save_audio, today_cache
 
 router = APIRouter(prefix="/api/news/ingest")
 
@@ -15,22 +15,20 @@ router = APIRouter(prefix="/api/news/ingest")
 async def ingest_article(data: NewsArticleCreate) -> dict:
     """Create a new news article. Called by n8n after RSS fetch."""
     async with async_session() as session:
-        # Check for duplicate URL
-        stmt = select(NewsArticle).where(NewsArticle.url == data.url)
-        result = await session.execute(stmt)
-        existing = result.scalar_one_or_none()
-        if existing:
-            return {"id": existing.id, "duplicate": True}
+        results = await create_articles(session, [data])
+        return results[0]
+
 
-        article = await create_article(
-            session,
-            source=data.source,
-            title=data.title,
-            url=data.url,
-            description=data.description,
-            published_at=data.published_at,
-        )
-        return {"id": article.id, "duplicate": False}
+@router.post("/articles")
+async def ingest_articles(items: list[NewsArticleCreate]) -> dict:
+    """Create a batch of news articles in one transaction. Duplicate URLs are skipped."""
+    async with async_session() as session:
+        results = await create_articles(session, items)
+    return {
+        "results": results,
+        "inserted": sum(1 for r in results if not r["duplicate"]),
+        "duplicates": sum(1 for r in results if r["duplicate"]),
+    }
 
 
 @router.post("/article/{article_id}/audio")
@@ -46,8 +44,7 @@ async def upload_audio(article_id: str, engine: str, file: UploadFile) -> dict:
         if not article:
             raise HTTPException(status_code=404, detail="Artikel niet gevonden")
 
-        audio_bytes = await file.read()
-        rel_path = await save_audio(article_id, engine, audio_bytes)
+        rel_path = await save_audio(article_id, engine, file.file)
 
         if engine == "piper":
             article.audio_piper = rel_path
@@ -55,4 +52,5 @@ async def upload_audio(article_id: str, engine: str, file: UploadFile) -> dict:
             article.audio_parkiet = rel_path
         article.rendered_at = datetime.now(timezone.utc)
         await session.commit()
+        today_cache.invalidate()
         return {"status": "ok", "path": rel_path}
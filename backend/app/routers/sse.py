@@ -0,0 +1,13 @@
+import json
+
+
+def sse_event(event: str | None, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+# Comment line that keeps idle connections (and proxies) from timing out
+SSE_KEEPALIVE = ": keepalive\n\n"
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
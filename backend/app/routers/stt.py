@@ -1,33 +1,39 @@
 import logging
+import os
+from typing import BinaryIO
 
 import httpx
 from fastapi import APIRouter, File, HTTPException, UploadFile
 
-from app.services.http_client import service_retry
+from app.services.http_client import get_client, service_retry
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
-STT_URL = "http://stt:8001/api/stt"
+STT_URL = os.getenv("STT_URL", "http://stt:8001/api/stt")
 
 
-@service_retry
-async def _call_stt(audio_bytes: bytes, filename: str, content_type: str) -> dict:
-    """Call STT service with retry on transient errors."""
-    async with httpx.AsyncClient(timeout=600) as client:
-        resp = await client.post(
-            STT_URL,
-            files={"audio": (filename, audio_bytes, content_type)},
-        )
-        resp.raise_for_status()
-        return resp.json()
+@service_retry("stt")
+async def _call_stt(audio: BinaryIO, filename: str, content_type: str) -> dict:
+    """Call STT service with retry on transient errors.
+
+    The audio is streamed to the STT service in chunks straight from the
+    upload's spooled temp file. Each attempt rewinds it instead of holding
+    a second copy in memory.
+    """
+    audio.seek(0)
+    resp = await get_client("stt").post(
+        STT_URL,
+        files={"audio": (filename, audio, content_type)},
+    )
+    resp.raise_for_status()
+    return resp.json()
 
 
 @router.post("/api/stt")
 async def speech_to_text(audio: UploadFile = File(...)):
     """Proxy audio upload to the STT service and return its transcription."""
-    audio_bytes = await audio.read()
     try:
-        return await _call_stt(audio_bytes, audio.filename, audio.content_type)
+        return await _call_stt(audio.file, audio.filename, audio.content_type)
     except httpx.RequestError:
         logger.error("STT service unreachable after retries")
         raise HTTPException(status_code=503, detail="STT-service niet beschikbaar")
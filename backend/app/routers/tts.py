@@ -1,15 +1,18 @@
 import logging
+import os
+import time
+from collections.abc import AsyncIterator
 
 import httpx
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 
-from app.services.http_client import service_retry
+from app.services.http_client import get_client, service_retry
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
-TTS_BASE = "http://tts:8002/api/tts"
+TTS_BASE = os.getenv("TTS_URL", "http://tts:8002/api/tts")
 
 
 class SynthesizeRequest(BaseModel):
@@ -18,37 +21,94 @@ class SynthesizeRequest(BaseModel):
     voice: str = "default"
 
 
-@service_retry
+@service_retry("tts")
 async def _call_synthesize(payload: dict) -> httpx.Response:
     """Call TTS synthesize with retry on transient errors."""
-    async with httpx.AsyncClient(timeout=300) as client:
-        resp = await client.post(f"{TTS_BASE}/synthesize", json=payload)
+    resp = await get_client("tts").post(f"{TTS_BASE}/synthesize", json=payload)
+    resp.raise_for_status()
+    return resp
+
+
+@service_retry("tts")
+async def _open_synthesize_stream(payload: dict) -> httpx.Response:
+    """Start a streamed TTS synthesize call with retry on transient errors.
+
+    Only opening the stream is retried. The caller must close the response.
+    """
+    client = get_client("tts")
+    request = client.build_request("POST", f"{TTS_BASE}/synthesize", json=payload)
+    resp = await client.send(request, stream=True)
+    if resp.is_error:
+        await resp.aread()
+        await resp.aclose()
         resp.raise_for_status()
-        return resp
+    return resp
 
 
-@service_retry
+@service_retry("tts")
 async def _call_engines() -> dict:
     """Call TTS engines endpoint with retry."""
-    async with httpx.AsyncClient(timeout=10) as client:
-        resp = await client.get(f"{TTS_BASE}/engines")
-        resp.raise_for_status()
-        return resp.json()
+    resp = await get_client("tts").get(f"{TTS_BASE}/engines", timeout=10)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def _x_headers(resp: httpx.Response) -> dict[str, str]:
+    """Forward the TTS service's x-* headers (engine, duration, ...)."""
+    return {k: v for k, v in resp.headers.items() if k.lower().startswith("x-")}
+
+
+async def _stream_synthesize(payload: dict, started: float) -> StreamingResponse:
+    """Forward WAV bytes to the client as they arrive from the TTS service."""
+    resp = await _open_synthesize_stream(payload)
+    chunks = resp.aiter_bytes()
+    try:
+        first = await anext(chunks, b"")
+    except BaseException:
+        await resp.aclose()
+        raise
+    ttfb_ms = (time.perf_counter() - started) * 1000
+    logger.info("TTS stream: first byte after %.0f ms", ttfb_ms)
+
+    async def body() -> AsyncIterator[bytes]:
+        total = len(first)
+        try:
+            yield first
+            async for chunk in chunks:
+                total += len(chunk)
+                yield chunk
+        except httpx.HTTPError as e:
+            logger.error("TTS stream aborted after %d bytes: %s", total, e)
+        finally:
+            await resp.aclose()
+            logger.info(
+                "TTS stream: %d bytes in %.0f ms",
+                total,
+                (time.perf_counter() - started) * 1000,
+            )
+
+    headers = _x_headers(resp)
+    headers["x-tts-first-byte-ms"] = f"{ttfb_ms:.0f}"
+    return StreamingResponse(body(), media_type="audio/wav", headers=headers)
 
 
 @router.post("/api/tts/synthesize")
-async def synthesize(req: SynthesizeRequest) -> Response:
-    """Proxy text to the TTS service and return WAV audio."""
+async def synthesize(req: SynthesizeRequest, stream: bool = False) -> Response:
+    """Proxy text to the TTS service and return WAV audio.
+
+    With ?stream=true the audio is forwarded chunk by chunk while the TTS
+    service renders it, instead of after the whole file is done.
+    x-tts-first-byte-ms (streamed) reports when the first audio byte was
+    available; x-tts-total-ms (not streamed) when the whole file was.
+    """
+    started = time.perf_counter()
     try:
+        if stream:
+            return await _stream_synthesize(req.model_dump(), started)
         resp = await _call_synthesize(req.model_dump())
-        return Response(
-            content=resp.content,
-            media_type="audio/wav",
-            headers={
-                k: v for k, v in resp.headers.items()
-                if k.lower().startswith("x-")
-            },
-        )
+        headers = _x_headers(resp)
+        headers["x-tts-total-ms"] = f"{(time.perf_counter() - started) * 1000:.0f}"
+        return Response(content=resp.content, media_type="audio/wav", headers=headers)
     except httpx.RequestError:
         logger.error("TTS service unreachable after retries")
         raise HTTPException(status_code=503, detail="TTS-service niet beschikbaar")
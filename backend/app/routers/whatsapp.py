@@ -1,10 +1,9 @@
 import logging
 import os
 
-import httpx
 from fastapi import APIRouter
 
-from app.services.http_client import service_retry
+from app.services.http_client import get_client, service_retry
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/whatsapp")
@@ -12,13 +11,12 @@ router = APIRouter(prefix="/api/whatsapp")
 WHATSAPP_BASE = os.getenv("WHATSAPP_BASE_URL", "http://whatsapp-web:3001")
 
 
-@service_retry
+@service_retry("whatsapp")
 async def _whatsapp_get(path: str) -> dict:
     """GET request to WhatsApp service with retry."""
-    async with httpx.AsyncClient(timeout=15) as client:
-        resp = await client.get(f"{WHATSAPP_BASE}{path}")
-        resp.raise_for_status()
-        return resp.json()
+    resp = await get_client("whatsapp").get(f"{WHATSAPP_BASE}{path}")
+    resp.raise_for_status()
+    return resp.json()
 
 
 @router.get("/status")
@@ -45,13 +43,13 @@ async def whatsapp_qr() -> dict:
 async def whatsapp_pair(body: dict) -> dict:
     """Request pairing code for phone number linking."""
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.post(
-                f"{WHATSAPP_BASE}/pair",
-                json=body,
-            )
-            resp.raise_for_status()
-            return resp.json()
+        resp = await get_client("whatsapp").post(
+            f"{WHATSAPP_BASE}/pair",
+            json=body,
+            timeout=30,
+        )
+        resp.raise_for_status()
+        return resp.json()
     except Exception as e:
         logger.warning("WhatsApp pair request failed: %s", e)
         return {"error": "Koppeling mislukt, probeer opnieuw"}
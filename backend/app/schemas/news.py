@@ -25,6 +25,23 @@ class NewsTodayResponse(BaseModel):
     audio_ready_count: int
 
 
+class BriefingTrackResponse(BaseModel):
+    id: str
+    source: str
+    title: str
+    audio_quality: str  # "parkiet" | "piper"
+    published_at: datetime
+    offset: int  # byte offset in /api/news/briefing/audio
+    length: int
+
+
+class BriefingResponse(BaseModel):
+    date: str
+    etag: str
+    total_bytes: int
+    tracks: list[BriefingTrackResponse]
+
+
 class NewsPreferencesRequest(BaseModel):
     feeds: list[str]
     max_articles: int = 20
@@ -0,0 +1,105 @@
+"""Small in-process caches."""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire after `ttl` seconds.
+
+    Not thread-safe; meant for use from the event loop only.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached value, or None on a miss or expired entry."""
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+        }
+
+
+class ResponseCache:
+    """One serialized response body with a strong ETag.
+
+    The entry lives until invalidate() or until the wall-clock expiry the
+    builder returns. A generation counter keeps a body built from data read
+    before the latest invalidate() from being stored; concurrent misses
+    share a single rebuild.
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._entry: tuple[bytes, str, float] | None = None
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> tuple[bytes, str] | None:
+        entry = self._entry
+        if entry is None or entry[2] <= time.time():
+            return None
+        return entry[0], entry[1]
+
+    async def get(
+        self, build: Callable[[], Awaitable[tuple[bytes, float]]]
+    ) -> tuple[bytes, str]:
+        """Return (body, etag), calling build() -> (body, expires_at) on a miss."""
+        cached = self._fresh()
+        if cached is None:
+            async with self._lock:
+                cached = self._fresh()
+                if cached is None:
+                    self.misses += 1
+                    generation = self._generation
+                    body, expires_at = await build()
+                    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+                    if generation == self._generation:
+                        self._entry = (body, etag, expires_at)
+                    return body, etag
+        self.hits += 1
+        return cached
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._entry = None
+
+    def stats(self) -> dict:
+        """Hit/miss counters and whether a body is currently cached."""
+        return {"hits": self.hits, "misses": self.misses, "cached": self._fresh() is not None}
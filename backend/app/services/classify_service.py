@@ -1,15 +1,26 @@
+import copy
+import hashlib
 import json
 import logging
 import os
+import re
+import time
+import unicodedata
+from datetime import datetime
 
 import httpx
 from fastapi import HTTPException
 
-from app.services.http_client import service_retry
+from app.services import intent_rules
+from app.services.cache import TTLCache
+from app.services.http_client import get_client, service_retry
+from app.services.inference_profiles import profile
+from app.services.metrics import observe_ollama
+from app.services.ollama_model import MODEL
+from app.services.ollama_scheduler import scheduler
 
 logger = logging.getLogger(__name__)
 OLLAMA_BASE = os.getenv("OLLAMA_BASE_URL", "http://ollama:11434")
-MODEL = "llama3:8b-instruct-q4_K_M"
 
 CLASSIFY_SYSTEM = """Je bent een intent-classificatie engine. Analyseer de Nederlandse transcriptie en bepaal de intentie.
 
@@ -40,29 +51,176 @@ Uitvoer: {"intent": "aantekening", "params": {"tekst": "de vergadering is verpla
 
 CONFIDENCE_THRESHOLD = 0.7
 
+# Rule matches at or above this confidence skip the LLM entirely
+FAST_PATH_THRESHOLD = float(os.getenv("INTENT_FAST_PATH_THRESHOLD", "0.9"))
 
-@service_retry
+# Cache of LLM classifications, keyed on the normalized transcription
+CACHE_SIZE = int(os.getenv("CLASSIFY_CACHE_SIZE", "512"))
+CACHE_TTL = float(os.getenv("CLASSIFY_CACHE_TTL", "600"))
+_cache = TTLCache(CACHE_SIZE, CACHE_TTL)
+
+# Prompt-prefix reuse. Ollama keeps the KV cache of the previous prompt per
+# slot and only evaluates the tokens after the longest shared prefix. Every
+# classify prompt starts with the same CLASSIFY_SYSTEM message (the
+# transcription only ever goes in the user message after it), so once that
+# prefix is evaluated, each call only pays for the transcription. Priming
+# evaluates it right after the model is loaded, so the first call doesn't.
+PREFIX_CACHE = os.getenv("CLASSIFY_PREFIX_CACHE", "1") == "1"
+# Changes with the model, the prompt text or the context size (a different
+# num_ctx reloads the model): any of these makes the primed prefix useless,
+# so a mismatch primes again. Sampling options don't touch the prompt cache.
+PREFIX_FINGERPRINT = hashlib.sha256(
+    "\0".join((MODEL, CLASSIFY_SYSTEM, str(profile("classify").num_ctx))).encode()
+).hexdigest()[:12]
+
+
+@service_retry("ollama")
 async def _call_ollama(payload: dict) -> dict:
     """Call Ollama chat API with retry on transient errors."""
-    async with httpx.AsyncClient(timeout=120) as client:
-        resp = await client.post(f"{OLLAMA_BASE}/api/chat", json=payload)
-        resp.raise_for_status()
-        return resp.json()
+    async with scheduler.slot("interactive"):
+        resp = await get_client("ollama").post(f"{OLLAMA_BASE}/api/chat", json=payload)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def _normalize(text: str) -> str:
+    """Cache key: case-folded, punctuation stripped, whitespace collapsed."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters of the classification cache."""
+    return _cache.stats()
+
+
+class PrefixState:
+    def __init__(self) -> None:
+        # Fingerprint the prefix was primed for since the last model load. Chat
+        # and summarize calls in between can still push it out of Ollama's
+        # cache; `reused` counts the classify calls that actually hit it.
+        self.primed: str | None = None
+        self.primed_at: datetime | None = None
+        self.prefix_tokens: int | None = None
+        self.prime_ms: float | None = None
+        self.calls = 0
+        self.reused = 0
+        self.prompt_tokens = 0
+        self.prompt_eval_ns = 0
+        self.eval_ns = 0
+        self.last: dict | None = None
+
+    def observe(self, data: dict) -> None:
+        """Add the Ollama timings of a classify call."""
+        self.calls += 1
+        self.prompt_tokens += data.get("prompt_eval_count", 0)
+        self.prompt_eval_ns += data.get("prompt_eval_duration", 0)
+        self.eval_ns += data.get("eval_duration", 0)
+        # On a cache hit Ollama only counts the tokens after the shared prefix
+        count = data.get("prompt_eval_count")
+        reused = None
+        if count is not None and self.prefix_tokens:
+            reused = count < self.prefix_tokens
+            self.reused += reused
+        self.last = {
+            "prefix_reused": reused,
+            "prompt_eval_count": count,
+            "prompt_eval_ms": _ms(data.get("prompt_eval_duration")),
+            "eval_count": data.get("eval_count"),
+            "eval_ms": _ms(data.get("eval_duration")),
+        }
+
+    def snapshot(self) -> dict:
+        n = self.calls or 1
+        return {
+            "enabled": PREFIX_CACHE,
+            "fingerprint": PREFIX_FINGERPRINT,
+            "primed_since_load": self.primed == PREFIX_FINGERPRINT,
+            "primed_at": self.primed_at.isoformat() if self.primed_at else None,
+            "prefix_tokens": self.prefix_tokens,
+            "prime_ms": self.prime_ms,
+            "calls": self.calls,
+            "reused": self.reused,
+            "avg_prompt_eval_count": round(self.prompt_tokens / n, 1),
+            "avg_prompt_eval_ms": _ms(self.prompt_eval_ns / n),
+            "avg_eval_ms": _ms(self.eval_ns / n),
+            "last": self.last,
+        }
+
+
+def _ms(ns: float | None) -> float | None:
+    return round(ns / 1e6, 1) if ns is not None else None
+
+
+_prefix = PrefixState()
+
+
+def prefix_stats() -> dict:
+    """Prompt-prefix priming state and Ollama prompt/generation timings."""
+    return _prefix.snapshot()
+
+
+async def prime_prefix(force: bool = False) -> None:
+    """Have Ollama evaluate CLASSIFY_SYSTEM so classify calls reuse it.
+
+    Skipped when disabled or already primed for the current fingerprint;
+    force=True primes again, e.g. after the model was unloaded.
+    """
+    if not PREFIX_CACHE or (_prefix.primed == PREFIX_FINGERPRINT and not force):
+        return
+    # Same options as classify, so num_ctx matches and the model isn't
+    # reloaded. One output token is enough, the point is the prompt evaluation.
+    payload = profile("classify").apply(
+        {
+            "model": MODEL,
+            "messages": [{"role": "system", "content": CLASSIFY_SYSTEM}],
+            "stream": False,
+        }
+    )
+    payload["options"] = {**payload.get("options", {}), "num_predict": 1}
+    start = time.monotonic()
+    data = await _call_ollama(payload)
+    observe_ollama("classify_prime", data)
+    _prefix.primed = PREFIX_FINGERPRINT
+    _prefix.primed_at = datetime.now().astimezone()
+    _prefix.prefix_tokens = data.get("prompt_eval_count")
+    _prefix.prime_ms = round((time.monotonic() - start) * 1000, 1)
+    logger.info(
+        "Classify prompt primed (%s tokens) in %.0f ms", _prefix.prefix_tokens, _prefix.prime_ms
+    )
 
 
 async def classify(transcription: str) -> dict:
-    """Classify a Dutch transcription into an intent with parameters."""
-    payload = {
-        "model": MODEL,
-        "messages": [
-            {"role": "system", "content": CLASSIFY_SYSTEM},
-            {"role": "user", "content": transcription},
-        ],
-        "stream": False,
-        "format": "json",
-    }
+    """Classify a Dutch transcription into an intent with parameters.
+
+    Regular commands are answered by the rule-based fast path; everything
+    else goes through the cache and then the LLM.
+    """
+    fast = intent_rules.match(transcription)
+    if fast is not None and fast["confidence"] >= FAST_PATH_THRESHOLD:
+        return fast
+
+    key = _normalize(transcription)
+    cached = _cache.get(key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
+    payload = profile("classify").apply(
+        {
+            "model": MODEL,
+            "messages": [
+                {"role": "system", "content": CLASSIFY_SYSTEM},
+                {"role": "user", "content": transcription},
+            ],
+            "stream": False,
+            "format": "json",
+        }
+    )
     try:
         data = await _call_ollama(payload)
+        observe_ollama("classify", data)
+        _prefix.observe(data)
         raw = data["message"]["content"]
         result = json.loads(raw)
 
@@ -82,6 +240,8 @@ async def classify(transcription: str) -> dict:
         if "params" not in result:
             result["params"] = {"tekst": transcription}
 
+        # Only genuine LLM results are cached, never fallbacks
+        _cache.set(key, copy.deepcopy(result))
         return result
     except (json.JSONDecodeError, KeyError):
         logger.warning("LLM returned invalid JSON, falling back to aantekening")
@@ -1,57 +1,256 @@
+"""Retention cleanup for news articles, cached summaries and audio files.
+
+Runs daily at CLEANUP_AT (local time). The time of the last run is kept in
+CLEANUP_STATE_PATH, so a restart neither resets the schedule nor skips a
+run that was due while the backend was down.
+
+Each run:
+- deletes expired rows in batches of CLEANUP_BATCH_SIZE, one short
+  transaction each, so writers are never blocked for long
+- removes expired audio date directories
+- removes orphaned audio files (no row points at them) once they are
+  older than the grace period, which covers uploads that are between
+  write and commit
+- clears audio_piper / audio_parkiet paths whose file is gone
+
+All filesystem work runs in a worker thread.
+"""
+
 import asyncio
+import json
 import logging
+import os
 import shutil
+import time
+from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-from sqlalchemy import delete
+from sqlalchemy import delete, select, update
 
 from app.database import async_session
 from app.models.news import NewsArticle
+from app.services.llm_service import purge_summary_cache
+from app.services.news_service import today_cache
 
 logger = logging.getLogger(__name__)
 
 AUDIO_BASE = Path("/data/audio/news")
-RETENTION_DAYS = 7
+RETENTION_DAYS = int(os.getenv("NEWS_RETENTION_DAYS", "7"))
+CLEANUP_AT = os.getenv("CLEANUP_AT", "03:30")
+CLEANUP_BATCH_SIZE = int(os.getenv("CLEANUP_BATCH_SIZE", "500"))
+ORPHAN_GRACE = timedelta(hours=float(os.getenv("CLEANUP_ORPHAN_GRACE_HOURS", "6")))
+STATE_PATH = Path(os.getenv("CLEANUP_STATE_PATH", "/data/cleanup_state.json"))
 
+# Re-check the clock at least this often while waiting for the next run
+_MAX_SLEEP = 3600
+
+
+@dataclass
+class CleanupReport:
+    rows_deleted: int = 0
+    summaries_purged: int = 0
+    dirs_deleted: int = 0
+    orphans_deleted: int = 0
+    dangling_cleared: int = 0
+    bytes_reclaimed: int = 0
+    duration_ms: float = 0.0
+
+
+@dataclass
+class _FileSweep:
+    dirs_deleted: int = 0
+    orphans_deleted: int = 0
+    bytes_reclaimed: int = 0
+    missing: frozenset[str] = frozenset()
+
+
+# --- Database ---
 
-async def cleanup_old_news() -> None:
-    """Delete news articles and audio files older than RETENTION_DAYS."""
-    cutoff = datetime.now(timezone.utc) - timedelta(days=RETENTION_DAYS)
 
-    # Delete old DB records
+async def _delete_expired_rows(cutoff: datetime) -> int:
+    """Delete rows older than cutoff, one bounded transaction per batch."""
+    total = 0
+    while True:
+        async with async_session() as session:
+            ids = list(
+                (
+                    await session.execute(
+                        select(NewsArticle.id)
+                        .where(NewsArticle.created_at < cutoff)
+                        .limit(CLEANUP_BATCH_SIZE)
+                    )
+                ).scalars()
+            )
+            if not ids:
+                return total
+            await session.execute(delete(NewsArticle).where(NewsArticle.id.in_(ids)))
+            await session.commit()
+        total += len(ids)
+        if len(ids) < CLEANUP_BATCH_SIZE:
+            return total
+        await asyncio.sleep(0)  # let other requests at the writer in between
+
+
+async def _audio_refs() -> list[tuple[str, str | None, str | None]]:
+    """(id, audio_piper, audio_parkiet) for every row that has audio."""
     async with async_session() as session:
         result = await session.execute(
-            delete(NewsArticle).where(NewsArticle.created_at < cutoff)
+            select(NewsArticle.id, NewsArticle.audio_piper, NewsArticle.audio_parkiet).where(
+                (NewsArticle.audio_piper.is_not(None)) | (NewsArticle.audio_parkiet.is_not(None))
+            )
         )
-        count = result.rowcount
-        await session.commit()
-        if count:
-            logger.info("Cleaned up %d old news articles from database", count)
+        return list(result.tuples())
 
-    # Delete old date directories
-    if not AUDIO_BASE.exists():
-        return
 
-    for date_dir in AUDIO_BASE.iterdir():
-        if not date_dir.is_dir():
-            continue
-        try:
-            dir_date = datetime.strptime(date_dir.name, "%Y-%m-%d").replace(
-                tzinfo=timezone.utc
-            )
+async def _clear_dangling(
+    refs: list[tuple[str, str | None, str | None]], missing: frozenset[str]
+) -> int:
+    """Null audio paths whose file no longer exists. Returns paths cleared."""
+    cleared = 0
+    for column, index in ((NewsArticle.audio_piper, 1), (NewsArticle.audio_parkiet, 2)):
+        ids = [ref[0] for ref in refs if ref[index] in missing]
+        for i in range(0, len(ids), CLEANUP_BATCH_SIZE):
+            batch = ids[i : i + CLEANUP_BATCH_SIZE]
+            async with async_session() as session:
+                # Only clear if the path wasn't replaced by a new upload meanwhile
+                result = await session.execute(
+                    update(NewsArticle)
+                    .where(NewsArticle.id.in_(batch), column.in_(missing))
+                    .values({column: None})
+                )
+                await session.commit()
+            cleared += result.rowcount
+    return cleared
+
+
+# --- Filesystem (worker thread) ---
+
+
+def _tree_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def _sweep_files(cutoff: datetime, referenced: set[str], grace: timedelta) -> _FileSweep:
+    """Delete expired date dirs and old orphans; report referenced files that are missing."""
+    sweep = _FileSweep()
+    if AUDIO_BASE.exists():
+        orphan_before = time.time() - grace.total_seconds()
+        for date_dir in AUDIO_BASE.iterdir():
+            if not date_dir.is_dir():
+                continue
+            try:
+                dir_date = datetime.strptime(date_dir.name, "%Y-%m-%d").replace(
+                    tzinfo=timezone.utc
+                )
+            except ValueError:
+                continue  # skip non-date directories
             if dir_date < cutoff:
+                size = _tree_size(date_dir)
                 shutil.rmtree(date_dir)
+                sweep.dirs_deleted += 1
+                sweep.bytes_reclaimed += size
                 logger.info("Deleted old audio directory: %s", date_dir.name)
-        except ValueError:
-            pass  # skip non-date directories
+                continue
+            for f in date_dir.iterdir():
+                # Temp files (.<name>.part) are never referenced, so stale ones go too
+                rel = f"{date_dir.name}/{f.name}"
+                if not f.is_file() or rel in referenced:
+                    continue
+                st = f.stat()
+                if st.st_mtime < orphan_before:
+                    f.unlink(missing_ok=True)
+                    sweep.orphans_deleted += 1
+                    sweep.bytes_reclaimed += st.st_size
+                    logger.info("Deleted orphaned audio file: %s", rel)
+    sweep.missing = frozenset(rel for rel in referenced if not (AUDIO_BASE / rel).is_file())
+    return sweep
+
+
+# --- Run + schedule ---
+
+
+async def cleanup_old_news() -> CleanupReport:
+    """Apply retention to rows, summaries and audio files. Returns what was reclaimed."""
+    start = time.monotonic()
+    cutoff = datetime.now(timezone.utc) - timedelta(days=RETENTION_DAYS)
+    report = CleanupReport()
+
+    report.rows_deleted = await _delete_expired_rows(cutoff)
+    # Summaries expire with the articles they were made for
+    report.summaries_purged = await purge_summary_cache(cutoff)
+
+    refs = await _audio_refs()
+    referenced = {path for ref in refs for path in ref[1:] if path}
+    sweep = await asyncio.to_thread(_sweep_files, cutoff, referenced, ORPHAN_GRACE)
+    report.dirs_deleted = sweep.dirs_deleted
+    report.orphans_deleted = sweep.orphans_deleted
+    report.bytes_reclaimed = sweep.bytes_reclaimed
+    if sweep.missing:
+        report.dangling_cleared = await _clear_dangling(refs, sweep.missing)
+
+    if report.rows_deleted or report.dangling_cleared:
+        today_cache.invalidate()
+    report.duration_ms = round((time.monotonic() - start) * 1000, 1)
+    logger.info("News cleanup finished: %s", asdict(report))
+    return report
+
+
+def _read_state() -> dict:
+    try:
+        return json.loads(STATE_PATH.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _write_state(state: dict) -> None:
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state), encoding="utf-8")
+    os.replace(tmp, STATE_PATH)
+
+
+def next_run(now: datetime, last_run: datetime | None) -> datetime:
+    """When the next cleanup is due: now if a scheduled run was missed."""
+    hour, minute = (int(part) for part in CLEANUP_AT.split(":"))
+    slot = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if slot > now:
+        slot -= timedelta(days=1)
+    if last_run is None or last_run < slot:
+        return now
+    return slot + timedelta(days=1)
+
+
+async def cleanup_status() -> dict:
+    """Last run, its report, and the next scheduled run."""
+    state = await asyncio.to_thread(_read_state)
+    last_run = datetime.fromisoformat(state["last_run"]) if "last_run" in state else None
+    now = datetime.now().astimezone()
+    return {
+        "schedule": CLEANUP_AT,
+        "retention_days": RETENTION_DAYS,
+        "last_run": state.get("last_run"),
+        "next_run": next_run(now, last_run).isoformat(),
+        "last_report": state.get("last_report"),
+    }
 
 
 async def daily_cleanup_loop() -> None:
-    """Run cleanup once per day. Call as a background task in lifespan."""
+    """Run cleanup daily at CLEANUP_AT. Call as a background task in lifespan."""
     while True:
-        await asyncio.sleep(86400)  # 24 hours
+        state = await asyncio.to_thread(_read_state)
+        last_run = datetime.fromisoformat(state["last_run"]) if "last_run" in state else None
+        now = datetime.now().astimezone()
+        due = next_run(now, last_run)
+        if due > now:
+            await asyncio.sleep(min((due - now).total_seconds(), _MAX_SLEEP))
+            continue
         try:
-            await cleanup_old_news()
+            report = await cleanup_old_news()
         except Exception:
             logger.exception("Cleanup failed")
+            # Retry at the next wall-clock check instead of spinning
+            await asyncio.sleep(_MAX_SLEEP)
+            continue
+        state = {"last_run": now.isoformat(), "last_report": asdict(report)}
+        await asyncio.to_thread(_write_state, state)
@@ -0,0 +1,42 @@
+"""In-process pub/sub for flow execution status changes.
+
+flow_service publishes a FlowStatusResponse after every status change;
+SSE subscribers receive it on their own queue. No database polling.
+"""
+
+import asyncio
+from collections import defaultdict
+
+from app.schemas.flow import FlowStatusResponse
+
+TERMINAL_STATUSES = ("success", "error")
+
+
+class FlowEventBus:
+    def __init__(self) -> None:
+        self._subscribers: dict[str, set[asyncio.Queue[FlowStatusResponse]]] = defaultdict(set)
+
+    def publish(self, status: FlowStatusResponse) -> None:
+        """Deliver a status update to every subscriber of that execution."""
+        for queue in self._subscribers.get(status.execution_id, ()):
+            queue.put_nowait(status)
+
+    def subscribe(self, execution_id: str) -> asyncio.Queue[FlowStatusResponse]:
+        """Start receiving updates for one execution. Pair with unsubscribe()."""
+        queue: asyncio.Queue[FlowStatusResponse] = asyncio.Queue()
+        self._subscribers[execution_id].add(queue)
+        return queue
+
+    def unsubscribe(self, execution_id: str, queue: asyncio.Queue[FlowStatusResponse]) -> None:
+        subscribers = self._subscribers.get(execution_id)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[execution_id]
+
+    def subscriber_count(self) -> int:
+        """Open subscriptions over all executions (a /metrics gauge)."""
+        return sum(len(s) for s in self._subscribers.values())
+
+
+bus = FlowEventBus()
@@ -2,12 +2,13 @@ import json
 import logging
 import os
 
-import httpx
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.flow import FlowExecution
-from app.services.http_client import service_retry
+from app.schemas.flow import FlowStatusResponse
+from app.services.flow_events import bus
+from app.services.http_client import get_client, service_retry
 
 logger = logging.getLogger(__name__)
 N8N_BASE = os.getenv("N8N_WEBHOOK_URL", "http://n8n:5678")
@@ -19,6 +20,16 @@ FLOW_WEBHOOKS: dict[str, str] = {
 }
 
 
+def to_status(execution: FlowExecution) -> FlowStatusResponse:
+    """Build the public status view of an execution."""
+    return FlowStatusResponse(
+        execution_id=execution.id,
+        status=execution.status,
+        result=json.loads(execution.result_json) if execution.result_json else None,
+        error=execution.error,
+    )
+
+
 async def create_execution(
     session: AsyncSession, intent: str, params: dict, source_text: str
 ) -> FlowExecution:
@@ -35,19 +46,29 @@ async def create_execution(
     return execution
 
 
-async def execute_flow(session: AsyncSession, execution_id: str) -> FlowExecution:
-    """Execute a flow by calling the appropriate n8n webhook."""
-    stmt = select(FlowExecution).where(FlowExecution.id == execution_id)
-    result = await session.execute(stmt)
-    execution = result.scalar_one_or_none()
-    if not execution:
-        raise ValueError(f"Execution {execution_id} not found")
+async def execute_flow(session: AsyncSession, execution_id: str) -> FlowExecution | None:
+    """Claim a pending execution and run it via the appropriate n8n webhook.
+
+    Returns None if the execution doesn't exist or was already claimed.
+    """
+    # Atomic pending -> running claim, so a job never runs twice
+    claim = await session.execute(
+        update(FlowExecution)
+        .where(FlowExecution.id == execution_id, FlowExecution.status == "pending")
+        .values(status="running")
+    )
+    await session.commit()
+    if claim.rowcount == 0:
+        return None
+    execution = await get_execution(session, execution_id)
+    bus.publish(to_status(execution))
 
     # "aantekening" is stored directly, no n8n call needed
     if execution.intent == "aantekening":
         execution.status = "success"
         execution.result_json = json.dumps({"saved": True})
         await session.commit()
+        bus.publish(to_status(execution))
         return execution
 
     webhook_path = FLOW_WEBHOOKS.get(execution.intent)
@@ -55,11 +76,9 @@ async def execute_flow(session: AsyncSession, execution_id: str) -> FlowExecutio
         execution.status = "error"
         execution.error = f"Onbekend intent: {execution.intent}"
         await session.commit()
+        bus.publish(to_status(execution))
         return execution
 
-    execution.status = "running"
-    await session.commit()
-
     try:
         payload = {
             "execution_id": execution.id,
@@ -77,6 +96,7 @@ async def execute_flow(session: AsyncSession, execution_id: str) -> FlowExecutio
 
     await session.commit()
     await session.refresh(execution)
+    bus.publish(to_status(execution))
     return execution
 
 
@@ -87,10 +107,9 @@ async def get_execution(session: AsyncSession, execution_id: str) -> FlowExecuti
     return result.scalar_one_or_none()
 
 
-@service_retry
+@service_retry("n8n")
 async def _call_n8n(url: str, payload: dict) -> dict:
     """Call an n8n webhook with retry on transient errors."""
-    async with httpx.AsyncClient(timeout=60) as client:
-        resp = await client.post(url, json=payload)
-        resp.raise_for_status()
-        return resp.json()
+    resp = await get_client("n8n").post(url, json=payload)
+    resp.raise_for_status()
+    return resp.json()
@@ -0,0 +1,78 @@
+"""Background workers that run flow executions outside the HTTP request.
+
+The flow_executions table is the persistent queue: a row in "pending" is a
+job. An in-process asyncio.Queue of execution IDs only wakes the workers;
+on startup it is refilled from the table, so jobs survive a restart.
+"""
+
+import asyncio
+import logging
+import os
+
+from sqlalchemy import select, update
+
+from app.database import async_session
+from app.models.flow import FlowExecution
+from app.services.flow_service import execute_flow
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.getenv("FLOW_WORKERS", "2"))
+
+_queue: asyncio.Queue[str] = asyncio.Queue()
+
+
+def enqueue(execution_id: str) -> None:
+    """Hand a pending execution to the worker pool."""
+    _queue.put_nowait(execution_id)
+
+
+def queue_size() -> int:
+    """Executions waiting for a free worker."""
+    return _queue.qsize()
+
+
+async def recover_executions() -> None:
+    """Resume pending executions and fail the ones a restart interrupted.
+
+    A "running" execution may already have reached n8n (e.g. a WhatsApp
+    message was sent), so it is marked failed rather than run twice.
+    """
+    async with async_session() as session:
+        interrupted = await session.execute(
+            update(FlowExecution)
+            .where(FlowExecution.status == "running")
+            .values(status="error", error="Onderbroken door herstart van de backend")
+        )
+        result = await session.execute(
+            select(FlowExecution.id)
+            .where(FlowExecution.status == "pending")
+            .order_by(FlowExecution.created_at)
+        )
+        pending = list(result.scalars().all())
+        await session.commit()
+
+    if interrupted.rowcount:
+        logger.warning("Marked %d interrupted flow executions as failed", interrupted.rowcount)
+    for execution_id in pending:
+        enqueue(execution_id)
+    if pending:
+        logger.info("Resumed %d pending flow executions", len(pending))
+
+
+async def _worker(n: int) -> None:
+    while True:
+        execution_id = await _queue.get()
+        try:
+            async with async_session() as session:
+                await execute_flow(session, execution_id)
+        except Exception:
+            logger.exception("Flow worker %d failed on %s", n, execution_id)
+        finally:
+            _queue.task_done()
+
+
+async def start_workers() -> list[asyncio.Task]:
+    """Recover the queue and start WORKERS background workers."""
+    await recover_executions()
+    return [asyncio.create_task(_worker(n)) for n in range(WORKERS)]
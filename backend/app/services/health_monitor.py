@@ -0,0 +1,206 @@
+"""Background health prober for the database and downstream services.
+
+Probes run every HEALTH_INTERVAL seconds from the app lifespan, so
+/api/health and in-process callers read cached state instead of hitting
+Ollama, n8n etc. on every request. Per service the monitor keeps the last
+HEALTH_HISTORY results; a service whose status changed at least
+HEALTH_FLAP_THRESHOLD times within that window is reported as flapping.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+import httpx
+from sqlalchemy import text
+
+from app.database import async_read_session
+from app.services import inference_profiles, ollama_model
+from app.services.http_client import breakers, get_probe_client, retry_budget
+
+logger = logging.getLogger(__name__)
+
+STT_URL = os.getenv("STT_HEALTH_URL", "http://stt:8001/health")
+TTS_URL = os.getenv("TTS_HEALTH_URL", "http://tts:8002/health")
+OLLAMA_URL = os.getenv("OLLAMA_BASE_URL", "http://ollama:11434")
+N8N_URL = os.getenv("N8N_HEALTH_URL", "http://n8n:5678/healthz")
+WHATSAPP_URL = os.getenv("WHATSAPP_HEALTH_URL", "http://whatsapp-web:3001/health")
+
+HEALTH_INTERVAL = float(os.getenv("HEALTH_INTERVAL", "15"))
+HEALTH_HISTORY = int(os.getenv("HEALTH_HISTORY", "20"))
+HEALTH_FLAP_THRESHOLD = int(os.getenv("HEALTH_FLAP_THRESHOLD", "4"))
+
+# Thresholds in seconds
+TIMEOUT = 5
+SLOW_THRESHOLD = 3
+
+
+# --- Probes ---
+
+
+async def _check_database() -> str:
+    """Check database connectivity with a simple query."""
+    try:
+        async with async_read_session() as session:
+            await session.execute(text("SELECT 1"))
+        return "ok"
+    except Exception as e:
+        logger.debug("Health probe failed: database — %s", e)
+        return "down"
+
+
+async def _check_http(name: str, url: str) -> str:
+    """Check an HTTP service via the probe client. Returns ok/down."""
+    try:
+        resp = await get_probe_client().get(url, timeout=TIMEOUT)
+        resp.raise_for_status()
+        return "ok"
+    except (httpx.RequestError, httpx.HTTPStatusError) as e:
+        logger.debug("Health probe failed: %s — %s", name, e)
+        return "down"
+
+
+async def _check_ollama() -> str:
+    """Check Ollama via /api/ps, which also tells whether the model is loaded."""
+    try:
+        resp = await get_probe_client().get(f"{OLLAMA_URL}/api/ps", timeout=TIMEOUT)
+        resp.raise_for_status()
+        ollama_model.state.update_from_ps(resp.json())
+        return "ok"
+    except (httpx.RequestError, httpx.HTTPStatusError, ValueError) as e:
+        logger.debug("Health probe failed: ollama — %s", e)
+        return "down"
+
+
+PROBES: dict[str, Callable[[], Awaitable[str]]] = {
+    "database": _check_database,
+    "stt": lambda: _check_http("stt", STT_URL),
+    "tts": lambda: _check_http("tts", TTS_URL),
+    "ollama": _check_ollama,
+    "n8n": lambda: _check_http("n8n", N8N_URL),
+    "whatsapp": lambda: _check_http("whatsapp", WHATSAPP_URL),
+}
+
+
+# --- State ---
+
+
+class ServiceHealth:
+    """Latest result and recent history of one service's probes."""
+
+    def __init__(self, history: int) -> None:
+        self.status = "unknown"
+        self.latency_ms: float | None = None
+        self.checked_at: datetime | None = None
+        self.changed_at: datetime | None = None
+        self._checked_mono: float | None = None
+        self._history: deque[tuple[str, float]] = deque(maxlen=history)
+
+    def record(self, status: str, latency_ms: float) -> bool:
+        """Store a probe result. Returns True if the status changed."""
+        now = datetime.now(timezone.utc)
+        changed = status != self.status
+        if changed:
+            self.changed_at = now
+        self.status = status
+        self.latency_ms = latency_ms
+        self.checked_at = now
+        self._checked_mono = time.monotonic()
+        self._history.append((status, latency_ms))
+        return changed
+
+    @property
+    def age(self) -> float | None:
+        """Seconds since the last probe, or None before the first one."""
+        return None if self._checked_mono is None else time.monotonic() - self._checked_mono
+
+    @property
+    def transitions(self) -> int:
+        statuses = [s for s, _ in self._history]
+        return sum(1 for a, b in zip(statuses, statuses[1:]) if a != b)
+
+    def snapshot(self) -> dict:
+        age = self.age
+        return {
+            "status": self.status,
+            "age_s": None if age is None else round(age, 1),
+            "latency_ms": self.latency_ms,
+            "latency_history_ms": [latency for _, latency in self._history],
+            "transitions": self.transitions,
+            "flapping": self.transitions >= HEALTH_FLAP_THRESHOLD,
+            "checked_at": self.checked_at.isoformat() if self.checked_at else None,
+            "since": self.changed_at.isoformat() if self.changed_at else None,
+        }
+
+
+class HealthMonitor:
+    def __init__(
+        self, probes: dict[str, Callable[[], Awaitable[str]]], interval: float, history: int
+    ) -> None:
+        self.probes = probes
+        self.interval = interval
+        self.services = {name: ServiceHealth(history) for name in probes}
+        self.checked_at: datetime | None = None
+        self._lock = asyncio.Lock()
+
+    async def _probe(self, name: str) -> None:
+        start = time.monotonic()
+        status = await self.probes[name]()
+        latency = time.monotonic() - start
+        if status == "ok" and latency > SLOW_THRESHOLD:
+            status = "slow"
+        health = self.services[name]
+        previous = health.status
+        if health.record(status, round(latency * 1000, 1)) and previous != "unknown":
+            log = logger.info if status == "ok" else logger.warning
+            log("Health of %s changed: %s -> %s", name, previous, status)
+
+    async def refresh(self) -> None:
+        """Probe every service once, in parallel."""
+        async with self._lock:
+            await asyncio.gather(*(self._probe(name) for name in self.probes))
+            self.checked_at = datetime.now(timezone.utc)
+
+    async def run(self) -> None:
+        """Refresh forever. Call as a background task in lifespan."""
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Health refresh failed")
+            await asyncio.sleep(self.interval)
+
+    def get_status(self, name: str) -> str:
+        """Cached status of a service: ok, slow, down, or unknown (never probed / stale)."""
+        health = self.services[name]
+        age = health.age
+        if age is None or age > 3 * self.interval:
+            return "unknown"
+        return health.status
+
+    def is_available(self, name: str) -> bool:
+        """False only when the service is known to be down; unknown counts as available."""
+        return self.get_status(name) != "down"
+
+    def snapshot(self) -> dict:
+        services = {name: h.snapshot() for name, h in self.services.items()}
+        for name, breaker in breakers.items():
+            if name in services:
+                services[name]["circuit"] = breaker.snapshot()
+        services["ollama"]["model"] = ollama_model.state.snapshot()
+        services["ollama"]["profiles"] = inference_profiles.snapshot()
+        all_ok = all(s["status"] == "ok" for s in services.values())
+        return {
+            "status": "ok" if all_ok else "degraded",
+            "services": services,
+            "checked_at": self.checked_at.isoformat() if self.checked_at else None,
+            "interval_s": self.interval,
+            "retry_budget": retry_budget.stats(),
+        }
+
+
+monitor = HealthMonitor(PROBES, HEALTH_INTERVAL, HEALTH_HISTORY)
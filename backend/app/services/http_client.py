@@ -1,25 +1,291 @@
-"""Shared retry decorator for transient HTTP errors.
+"""Shared HTTP plumbing for downstream services.
 
-Uses tenacity with exponential backoff + jitter.
-Only retries on network errors and 5xx status codes — never on 4xx.
+Pooled clients: one long-lived httpx.AsyncClient per downstream service
+(stt, tts, ollama, n8n, whatsapp), each with its own connection limits,
+keep-alive and timeouts. Opened in the app lifespan, reused by every call.
+Health probes use a separate small client, see get_probe_client().
+
+Retry decorator: service_retry("<service>"), tenacity with exponential
+backoff + jitter. Only retries on network errors and 5xx status codes —
+never on 4xx. Every attempt goes through the service's circuit breaker,
+and retries are drawn from a budget shared by all services, so a service
+that is down gets fast 503s instead of a growing pile of retries.
 """
 
+import functools
 import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
 
 import httpx
 from tenacity import (
     RetryCallState,
     retry,
-    retry_if_exception,
     stop_after_attempt,
     wait_exponential_jitter,
 )
 
+from app.services.metrics import (
+    DOWNSTREAM_ERRORS,
+    DOWNSTREAM_IN_FLIGHT,
+    DOWNSTREAM_RETRIES,
+    error_reason,
+    http_hooks,
+)
+from app.services import timing
+
 logger = logging.getLogger(__name__)
 
 
+# --- Pooled clients ---
+
+
+@dataclass(frozen=True)
+class ServicePool:
+    """Connection pool settings for one downstream service."""
+
+    timeout: float
+    connect_timeout: float = 5.0
+    max_connections: int = 10
+    max_keepalive: int = 5
+    keepalive_expiry: float = 30.0
+
+
+def _env_pool(service: str, default: ServicePool) -> ServicePool:
+    """Apply HTTP_<SERVICE>_* environment overrides to a pool default."""
+    prefix = f"HTTP_{service.upper()}_"
+    return ServicePool(
+        timeout=float(os.getenv(f"{prefix}TIMEOUT", default.timeout)),
+        connect_timeout=float(os.getenv(f"{prefix}CONNECT_TIMEOUT", default.connect_timeout)),
+        max_connections=int(os.getenv(f"{prefix}MAX_CONNECTIONS", default.max_connections)),
+        max_keepalive=int(os.getenv(f"{prefix}MAX_KEEPALIVE", default.max_keepalive)),
+        keepalive_expiry=float(os.getenv(f"{prefix}KEEPALIVE_EXPIRY", default.keepalive_expiry)),
+    )
+
+
+SERVICE_POOLS: dict[str, ServicePool] = {
+    "stt": _env_pool("stt", ServicePool(timeout=600, max_connections=8, max_keepalive=4)),
+    "tts": _env_pool("tts", ServicePool(timeout=300, max_connections=8, max_keepalive=4)),
+    "ollama": _env_pool("ollama", ServicePool(timeout=120, max_connections=16, max_keepalive=8)),
+    "n8n": _env_pool("n8n", ServicePool(timeout=60, max_connections=16, max_keepalive=8)),
+    "whatsapp": _env_pool("whatsapp", ServicePool(timeout=15, max_connections=8, max_keepalive=4)),
+}
+
+_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def _build_client(service: str) -> httpx.AsyncClient:
+    pool = SERVICE_POOLS[service]
+    hooks = http_hooks(service)
+    for kind, fns in timing.http_hooks(service).items():
+        hooks[kind] += fns
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(pool.timeout, connect=pool.connect_timeout),
+        limits=httpx.Limits(
+            max_connections=pool.max_connections,
+            max_keepalive_connections=pool.max_keepalive,
+            keepalive_expiry=pool.keepalive_expiry,
+        ),
+        event_hooks=hooks,
+    )
+
+
+def get_client(service: str) -> httpx.AsyncClient:
+    """Return the pooled client for a downstream service.
+
+    Created lazily if the lifespan hasn't opened it (scripts, benchmarks).
+    """
+    client = _clients.get(service)
+    if client is None or client.is_closed:
+        client = _clients[service] = _build_client(service)
+    return client
+
+
+# Probes must not wait for a pool slot behind long transcriptions (a pool
+# timeout would report a busy service as down), and their latency must not
+# mix with real calls in the downstream metrics, so they get their own
+# client without event hooks. Room for every service's probe at once, twice.
+PROBE_POOL = ServicePool(
+    timeout=5, max_connections=2 * len(SERVICE_POOLS), max_keepalive=len(SERVICE_POOLS)
+)
+
+
+def get_probe_client() -> httpx.AsyncClient:
+    """Return the client shared by all health probes."""
+    client = _clients.get("probe")
+    if client is None or client.is_closed:
+        client = _clients["probe"] = httpx.AsyncClient(
+            timeout=httpx.Timeout(PROBE_POOL.timeout, connect=PROBE_POOL.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=PROBE_POOL.max_connections,
+                max_keepalive_connections=PROBE_POOL.max_keepalive,
+                keepalive_expiry=PROBE_POOL.keepalive_expiry,
+            ),
+        )
+    return client
+
+
+async def open_clients() -> None:
+    """Open one pooled client per downstream service. Call from lifespan."""
+    for service in SERVICE_POOLS:
+        get_client(service)
+
+
+async def close_clients() -> None:
+    """Close all pooled clients and their keep-alive connections."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+# --- Circuit breaker ---
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+
+
+class CircuitOpenError(httpx.RequestError):
+    """Raised instead of calling a service whose circuit is open.
+
+    Subclasses RequestError so existing handlers already map it to 503.
+    """
+
+    def __init__(self, service: str) -> None:
+        super().__init__(f"Circuit for {service} is open")
+        self.service = service
+
+
+class CircuitBreaker:
+    """Closed → open after `threshold` consecutive failed attempts.
+
+    After `reset_timeout` seconds one trial call is let through (half-open);
+    its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, service: str, threshold: int, reset_timeout: float) -> None:
+        self.service = service
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+
+    def allow(self) -> bool:
+        """Whether an attempt may go out now. Claims the trial when half-open."""
+        if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self.state = "half_open"
+        if self.state == "closed":
+            return True
+        if self.state == "half_open" and not self._trial_running:
+            self._trial_running = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record(self, failed: bool) -> None:
+        """Record the outcome of an allowed attempt."""
+        self._trial_running = False
+        if not failed:
+            if self.state != "closed":
+                logger.info("Circuit for %s closed", self.service)
+            self.state = "closed"
+            self.failures = 0
+            return
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.threshold:
+            if self.state != "open":
+                logger.warning("Circuit for %s opened after %d failures", self.service, self.failures)
+                self.opened += 1
+            self.state = "open"
+            self._opened_at = time.monotonic()
+
+    def abandon(self) -> None:
+        """An allowed attempt ended without an outcome (cancelled)."""
+        self._trial_running = False
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+breakers: dict[str, CircuitBreaker] = {
+    service: CircuitBreaker(service, BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
+    for service in SERVICE_POOLS
+}
+
+
+# --- Retry budget ---
+
+RETRY_ATTEMPTS = 3
+RETRY_BUDGET_RATIO = float(os.getenv("RETRY_BUDGET_RATIO", "0.2"))
+RETRY_BUDGET_MIN = int(os.getenv("RETRY_BUDGET_MIN", "5"))
+RETRY_BUDGET_WINDOW = 10.0
+
+
+class RetryBudget:
+    """Allows retries up to `ratio` of the calls in the last `window` seconds.
+
+    `minimum` retries per window are always allowed, so low traffic can
+    still ride out a blip. Shared by all services.
+    """
+
+    def __init__(self, ratio: float, minimum: int, window: float) -> None:
+        self.ratio = ratio
+        self.minimum = minimum
+        self.window = window
+        self.denied = 0
+        self._calls: deque[float] = deque()
+        self._retries: deque[float] = deque()
+
+    def _prune(self, now: float) -> None:
+        for q in (self._calls, self._retries):
+            while q and q[0] < now - self.window:
+                q.popleft()
+
+    def record_call(self) -> None:
+        self._calls.append(time.monotonic())
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget; False when it is used up."""
+        now = time.monotonic()
+        self._prune(now)
+        if len(self._retries) >= max(self.minimum, self.ratio * len(self._calls)):
+            self.denied += 1
+            return False
+        self._retries.append(now)
+        return True
+
+    def stats(self) -> dict:
+        self._prune(time.monotonic())
+        return {
+            "window_s": self.window,
+            "calls": len(self._calls),
+            "retries": len(self._retries),
+            "allowed": max(self.minimum, int(self.ratio * len(self._calls))),
+            "denied": self.denied,
+        }
+
+
+retry_budget = RetryBudget(RETRY_BUDGET_RATIO, RETRY_BUDGET_MIN, RETRY_BUDGET_WINDOW)
+
+
+# --- Retry ---
+
+
 def _is_transient(exc: BaseException) -> bool:
     """Return True for errors worth retrying."""
+    if isinstance(exc, CircuitOpenError):
+        return False
     if isinstance(exc, httpx.RequestError):
         return True
     if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code >= 500:
@@ -37,10 +303,58 @@ def _log_retry(state: RetryCallState) -> None:
     )
 
 
-service_retry = retry(
-    stop=stop_after_attempt(3),
-    wait=wait_exponential_jitter(initial=1, max=10),
-    retry=retry_if_exception(_is_transient),
-    before_sleep=_log_retry,
-    reraise=True,
-)
+def _should_retry(service: str, state: RetryCallState) -> bool:
+    exc = state.outcome.exception() if state.outcome else None
+    if exc is None or not _is_transient(exc) or state.attempt_number >= RETRY_ATTEMPTS:
+        return False
+    if not retry_budget.try_spend():
+        logger.warning("Retry budget exhausted, not retrying %s: %s", state.fn.__name__, exc)
+        return False
+    DOWNSTREAM_RETRIES.labels(service, error_reason(exc)).inc()
+    return True
+
+
+def service_retry(service: str):
+    """Decorate an async call to `service` with breaker, retry and budget."""
+    breaker = breakers[service]
+    in_flight = DOWNSTREAM_IN_FLIGHT.labels(service)
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def attempt(*args, **kwargs):
+            if not breaker.allow():
+                DOWNSTREAM_ERRORS.labels(service, "circuit_open").inc()
+                raise CircuitOpenError(service)
+            in_flight.inc()
+            start = time.perf_counter()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                breaker.record(failed=_is_transient(e))
+                DOWNSTREAM_ERRORS.labels(service, error_reason(e)).inc()
+                raise
+            except BaseException:
+                breaker.abandon()
+                raise
+            finally:
+                in_flight.dec()
+                timing.record(service, time.perf_counter() - start)
+            breaker.record(failed=False)
+            return result
+
+        retrying = retry(
+            stop=stop_after_attempt(RETRY_ATTEMPTS),
+            wait=wait_exponential_jitter(initial=1, max=10),
+            retry=functools.partial(_should_retry, service),
+            before_sleep=_log_retry,
+            reraise=True,
+        )(attempt)
+
+        @functools.wraps(fn)
+        async def call(*args, **kwargs):
+            retry_budget.record_call()
+            return await retrying(*args, **kwargs)
+
+        return call
+
+    return decorator
@@ -0,0 +1,89 @@
+"""Named Ollama inference profiles: context size, output cap and sampling per task.
+
+Each task sends its profile as the request's `options` and `keep_alive`:
+
+    classify   short JSON answer: ~60 output tokens, greedy
+    summarize  4 sentences of one article: capped output
+    chat       conversation history: room for longer replies
+
+OLLAMA_PROFILES overrides fields per profile as JSON, e.g.
+    OLLAMA_PROFILES='{"classify": {"num_predict": 96}, "chat": {"temperature": 0.5}}'
+A field set to null falls back to the model default. keep_alive defaults to
+OLLAMA_KEEP_ALIVE, so regular calls don't shorten the preload's keep-alive to
+Ollama's own 5 minutes.
+
+num_ctx defaults to OLLAMA_NUM_CTX for every profile: Ollama reloads the
+model whenever a request asks for a different context size than the loaded
+one, so profiles that differ in num_ctx make the model reload back and forth.
+"""
+
+import json
+import os
+from dataclasses import asdict, dataclass, replace
+
+from app.services.ollama_model import KEEP_ALIVE, NUM_CTX
+
+
+@dataclass(frozen=True)
+class InferenceProfile:
+    num_ctx: int | None = NUM_CTX
+    num_predict: int | None = None
+    temperature: float | None = None
+    stop: tuple[str, ...] = ()
+    keep_alive: str | None = KEEP_ALIVE
+
+    def options(self) -> dict:
+        """The Ollama `options` for this profile; unset fields are left out."""
+        options = {
+            k: v
+            for k, v in (
+                ("num_ctx", self.num_ctx),
+                ("num_predict", self.num_predict),
+                ("temperature", self.temperature),
+            )
+            if v is not None
+        }
+        if self.stop:
+            options["stop"] = list(self.stop)
+        return options
+
+    def apply(self, payload: dict) -> dict:
+        """Add options and keep_alive to an /api/chat payload."""
+        if options := self.options():
+            payload["options"] = options
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+
+    def fingerprint(self) -> str:
+        """Stable text form of the settings that change the model's output."""
+        return json.dumps(self.options(), sort_keys=True)
+
+
+DEFAULTS = {
+    # The JSON answer is ~60 tokens; format=json already ends it cleanly
+    "classify": InferenceProfile(num_predict=128, temperature=0.0),
+    # No stop sequence: replies may open with a preamble line and a blank line
+    "summarize": InferenceProfile(num_predict=320, temperature=0.3),
+    "chat": InferenceProfile(num_predict=1024, temperature=0.7),
+}
+
+
+def _load(raw: str) -> dict[str, InferenceProfile]:
+    profiles = dict(DEFAULTS)
+    for name, fields in (json.loads(raw) if raw else {}).items():
+        if "stop" in fields:
+            fields = {**fields, "stop": tuple(fields["stop"] or ())}
+        profiles[name] = replace(profiles.get(name, InferenceProfile()), **fields)
+    return profiles
+
+
+PROFILES = _load(os.getenv("OLLAMA_PROFILES", ""))
+
+
+def profile(name: str) -> InferenceProfile:
+    return PROFILES[name]
+
+
+def snapshot() -> dict:
+    return {name: asdict(p) for name, p in PROFILES.items()}
@@ -0,0 +1,115 @@
+"""Deterministic fast path for the most regular Dutch voice commands.
+
+Each rule is a regex over the stripped transcription. Named groups are
+filled into the rule's params templates; `{text}` is the full text. A match
+returns the same {"intent", "params", "confidence"} dict as the LLM path.
+
+The default rules can be replaced with a JSON list of rule dicts via
+INTENT_RULES_PATH.
+"""
+
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_MESSAGE_WORD = r"(?:whatsapp(?:je|[ -]?bericht(?:je)?)?|berichtje|bericht|appje)"
+_CONTACT = r"(?P<contact>[\w'-]+(?: [\w'-]+){0,3}?)"
+# Only separators after which the rest can be sent or saved as-is. A "dat"
+# clause has subordinate word order ("dat ik wat later kom"); the LLM turns
+# it into a sentence of its own, so those go to the LLM.
+_SEPARATOR = r"(?:,? met |: ?)"
+_NOTE_SEPARATOR = r"(?: ?: ?|, )"
+# A note that mentions a message or article is ambiguous: leave it to the LLM
+_NOT_A_COMMAND = r"(?!.*\b(?:whatsapp|app(?:je)?|bericht(?:je)?|artikel)\b)"
+
+DEFAULT_RULES: list[dict] = [
+    {
+        "intent": "whatsapp",
+        "pattern": rf"^(?:stuur|verstuur|zend) (?:even )?(?:een )?{_MESSAGE_WORD} (?:aan|naar) {_CONTACT}{_SEPARATOR}(?P<bericht>.+)$",
+        "params": {"contact": "{contact}", "bericht": "{bericht}"},
+        "confidence": 0.95,
+    },
+    {
+        "intent": "whatsapp",
+        "pattern": rf"^(?:kun|kan|wil) je (?:even )?(?:een )?{_MESSAGE_WORD} (?:sturen|versturen) (?:aan|naar) {_CONTACT}{_SEPARATOR}(?P<bericht>.+)$",
+        "params": {"contact": "{contact}", "bericht": "{bericht}"},
+        "confidence": 0.95,
+    },
+    {
+        "intent": "whatsapp",
+        "pattern": rf"^(?:app|whatsapp) (?:even )?{_CONTACT}{_SEPARATOR}(?P<bericht>.+)$",
+        "params": {"contact": "{contact}", "bericht": "{bericht}"},
+        "confidence": 0.9,
+    },
+    {
+        "intent": "aantekening",
+        "pattern": rf"^(?:(?:schrijf|zet) (?:even )?(?:op|neer)|noteer(?: even)?){_NOTE_SEPARATOR}{_NOT_A_COMMAND}(?P<tekst>.+)$",
+        "params": {"tekst": "{tekst}"},
+        "confidence": 0.9,
+    },
+    {
+        "intent": "aantekening",
+        "pattern": rf"^(?:maak )?(?:een )?(?:aantekening|notitie)\b(?: maken)?{_NOTE_SEPARATOR}{_NOT_A_COMMAND}(?P<tekst>.+)$",
+        "params": {"tekst": "{tekst}"},
+        "confidence": 0.9,
+    },
+    {
+        "intent": "aantekening",
+        "pattern": r"^(?:vergeet niet|niet vergeten|onthoud|herinner me eraan) .+$",
+        "params": {"tekst": "{text}"},
+        "confidence": 0.9,
+    },
+    {
+        "intent": "artikel",
+        "pattern": r"^(?:maak|schrijf|herschrijf) (?:er )?(?:een )?artikel (?:van |uit )?(?P<brontekst>(?:.+? )?over (?P<onderwerp>.+))$",
+        "params": {"onderwerp": "{onderwerp}", "brontekst": "{brontekst}"},
+        "confidence": 0.9,
+    },
+]
+
+
+@dataclass(frozen=True)
+class IntentRule:
+    intent: str
+    pattern: re.Pattern
+    params: dict[str, str]
+    confidence: float
+
+
+def load_rules(path: str | None = None) -> list[IntentRule]:
+    """Compile rules from a JSON file, or the defaults when no path is given."""
+    raw = json.loads(Path(path).read_text(encoding="utf-8")) if path else DEFAULT_RULES
+    return [
+        IntentRule(
+            intent=r["intent"],
+            pattern=re.compile(r["pattern"], re.IGNORECASE),
+            params=r["params"],
+            confidence=float(r["confidence"]),
+        )
+        for r in raw
+    ]
+
+
+RULES = load_rules(os.getenv("INTENT_RULES_PATH"))
+
+
+def match(transcription: str, rules: list[IntentRule] = RULES) -> dict | None:
+    """Return the first matching rule's classification, or None."""
+    text = transcription.strip().rstrip(".!?").strip()
+    for rule in rules:
+        m = rule.pattern.match(text)
+        if not m:
+            continue
+        groups = {k: v.strip() for k, v in m.groupdict().items() if v}
+        try:
+            params = {k: v.format(text=text, **groups) for k, v in rule.params.items()}
+        except KeyError:
+            logger.warning("Intent rule %s has an unknown placeholder", rule.pattern.pattern)
+            continue
+        return {"intent": rule.intent, "params": params, "confidence": rule.confidence}
+    return None
@@ -0,0 +1,279 @@
+"""Prometheus metrics, served in text format on /metrics.
+
+Hot paths only touch pre-declared histograms, counters and gauges (a lock
+and a few additions each). State that already lives elsewhere — circuit
+breakers, the Ollama scheduler, caches, the flow queue — is read at scrape
+time by a collector, so it costs nothing between scrapes.
+"""
+
+import time
+
+import httpx
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services import timing
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+REQUEST_LATENCY = Histogram(
+    "memories_http_request_duration_seconds",
+    "Time until the response finished, per route",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge("memories_http_requests_in_flight", "Requests being handled")
+REQUEST_SIZE = Histogram(
+    "memories_http_request_size_bytes",
+    "Request body size (uploads), per route",
+    ["route"],
+    buckets=SIZE_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "memories_http_response_size_bytes",
+    "Response body size, per route",
+    ["route"],
+    buckets=SIZE_BUCKETS,
+)
+
+DOWNSTREAM_LATENCY = Histogram(
+    "memories_downstream_request_duration_seconds",
+    "Time until response headers from a downstream service",
+    ["service", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+DOWNSTREAM_IN_FLIGHT = Gauge(
+    "memories_downstream_calls_in_flight",
+    "service_retry attempts currently running, per service",
+    ["service"],
+)
+DOWNSTREAM_ERRORS = Counter(
+    "memories_downstream_errors_total",
+    "Failed service_retry attempts, per service and reason",
+    ["service", "reason"],
+)
+DOWNSTREAM_RETRIES = Counter(
+    "memories_downstream_retries_total",
+    "Retries scheduled by service_retry, per service and reason",
+    ["service", "reason"],
+)
+OLLAMA_PROMPT_EVAL = Histogram(
+    "memories_ollama_prompt_eval_seconds",
+    "Prompt processing time reported by Ollama, per task",
+    ["task"],
+    buckets=LATENCY_BUCKETS,
+)
+OLLAMA_PROMPT_TOKENS = Histogram(
+    "memories_ollama_prompt_eval_tokens",
+    "Prompt tokens Ollama evaluated (cached prefix excluded), per task",
+    ["task"],
+    buckets=(8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192),
+)
+OLLAMA_EVAL = Histogram(
+    "memories_ollama_eval_seconds",
+    "Generation time reported by Ollama, per task",
+    ["task"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+def observe_ollama(task: str, data: dict) -> None:
+    """Record the timings of a finished Ollama reply, also as Server-Timing spans.
+
+    Ollama reports durations in nanoseconds. Fields it left out are skipped.
+    """
+    if "prompt_eval_duration" in data:
+        seconds = data["prompt_eval_duration"] / 1e9
+        OLLAMA_PROMPT_EVAL.labels(task).observe(seconds)
+        timing.record("ollama_prompt_eval", seconds)
+    if "prompt_eval_count" in data:
+        OLLAMA_PROMPT_TOKENS.labels(task).observe(data["prompt_eval_count"])
+    if "eval_duration" in data:
+        seconds = data["eval_duration"] / 1e9
+        OLLAMA_EVAL.labels(task).observe(seconds)
+        timing.record("ollama_eval", seconds)
+
+
+def error_reason(exc: BaseException) -> str:
+    """Short, bounded label for why a downstream call failed."""
+    # Imported here: http_client imports this module
+    from app.services.http_client import CircuitOpenError
+
+    if isinstance(exc, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(exc, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(exc, httpx.ConnectError):
+        return "connect"
+    if isinstance(exc, httpx.RequestError):
+        return "network"
+    if isinstance(exc, httpx.HTTPStatusError):
+        return f"http_{exc.response.status_code // 100}xx"
+    return "other"
+
+
+# --- httpx event hooks (installed on every pooled client) ---
+
+
+def http_hooks(service: str) -> dict:
+    """Event hooks that time each request of a pooled client until its headers.
+
+    Health probes use their own client without these hooks, so only real
+    calls count towards the downstream latency.
+    """
+
+    async def on_request(request: httpx.Request) -> None:
+        request.extensions["metrics_start"] = time.perf_counter()
+
+    async def on_response(response: httpx.Response) -> None:
+        start = response.request.extensions.get("metrics_start")
+        if start is not None:
+            DOWNSTREAM_LATENCY.labels(
+                service, response.request.method, str(response.status_code)
+            ).observe(time.perf_counter() - start)
+
+    return {"request": [on_request], "response": [on_response]}
+
+
+# --- ASGI middleware ---
+
+
+class MetricsMiddleware:
+    """Route latency, in-flight count and body sizes for every HTTP request.
+
+    The route label is the matched path template, so ids in the URL don't
+    multiply the series; unmatched requests share one label.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        received = 0
+        sent = 0
+
+        async def counting_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message: Message) -> None:
+            nonlocal status, sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            label = getattr(route, "path", "unmatched")
+            REQUEST_LATENCY.labels(scope["method"], label, str(status)).observe(
+                time.perf_counter() - start
+            )
+            if received:
+                REQUEST_SIZE.labels(label).observe(received)
+            RESPONSE_SIZE.labels(label).observe(sent)
+
+
+# --- Scrape-time state ---
+
+
+class _StateCollector:
+    """Reads breaker, scheduler, cache, queue and SSE state when scraped."""
+
+    def describe(self):
+        # Registering would otherwise call collect() at import time
+        return []
+
+    def collect(self):
+        from app.services import flow_worker
+        from app.services.flow_events import bus
+        from app.services.classify_service import cache_stats
+        from app.services.http_client import breakers, retry_budget
+        from app.services.news_service import today_cache
+        from app.services.ollama_scheduler import scheduler
+
+        state = GaugeMetricFamily(
+            "memories_circuit_state",
+            "Circuit breaker state per service (0 closed, 1 half-open, 2 open)",
+            labels=["service"],
+        )
+        opened = CounterMetricFamily(
+            "memories_circuit_opened", "Times a circuit opened", labels=["service"]
+        )
+        rejected = CounterMetricFamily(
+            "memories_circuit_rejected", "Calls failed fast by an open circuit", labels=["service"]
+        )
+        levels = {"closed": 0, "half_open": 1, "open": 2}
+        for name, b in breakers.items():
+            state.add_metric([name], levels[b.state])
+            opened.add_metric([name], b.opened)
+            rejected.add_metric([name], b.rejected)
+        yield state
+        yield opened
+        yield rejected
+        yield CounterMetricFamily(
+            "memories_retry_budget_denied",
+            "Retries refused by the retry budget",
+            value=retry_budget.denied,
+        )
+
+        stats = scheduler.stats()
+        yield GaugeMetricFamily(
+            "memories_ollama_slots_in_use", "Ollama generation slots in use", value=stats["in_use"]
+        )
+        waiting = GaugeMetricFamily(
+            "memories_ollama_queue_waiting", "Calls waiting for an Ollama slot", labels=["priority"]
+        )
+        for priority, s in stats["classes"].items():
+            waiting.add_metric([priority], s["waiting"])
+        yield waiting
+
+        hits = CounterMetricFamily("memories_cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("memories_cache_misses", "Cache misses", labels=["cache"])
+        for name, s in (("classify", cache_stats()), ("news_today", today_cache.stats())):
+            hits.add_metric([name], s["hits"])
+            misses.add_metric([name], s["misses"])
+        yield hits
+        yield misses
+
+        yield GaugeMetricFamily(
+            "memories_flow_queue_size",
+            "Flow executions waiting for a worker",
+            value=flow_worker.queue_size(),
+        )
+        yield GaugeMetricFamily(
+            "memories_flow_event_subscribers",
+            "Open SSE streams waiting for flow status updates",
+            value=bus.subscriber_count(),
+        )
+
+
+REGISTRY.register(_StateCollector())
+
+
+def render() -> tuple[bytes, str]:
+    """Current metrics in Prometheus text format, with its content type."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
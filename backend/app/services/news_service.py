@@ -1,14 +1,35 @@
+import asyncio
+import hashlib
 import json
+import os
+import shutil
+import tempfile
+import uuid
+from dataclasses import dataclass
 from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
+from typing import BinaryIO
 
 from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.news import NewsArticle, NewsPreferences
+from app.schemas.news import NewsArticleCreate
+from app.services.cache import ResponseCache
+
+# Bound parameters per statement: the limit of SQLite builds before 3.32.
+# A multi-row INSERT binds one per column per row, an IN (...) one per value.
+SQLITE_MAX_VARIABLES = 999
+
+# Copy buffer for audio uploads; bounds memory use regardless of file size
+AUDIO_CHUNK = 1024 * 1024
 
 AUDIO_BASE = Path("/data/audio/news")
 
+# Serialized /api/news/today response; invalidated on every write to the list
+today_cache = ResponseCache()
+
 
 async def get_today_articles(session: AsyncSession) -> list[NewsArticle]:
     """Get news articles from the last 24 hours, newest first."""
@@ -22,6 +43,22 @@ async def get_today_articles(session: AsyncSession) -> list[NewsArticle]:
     return list(result.scalars().all())
 
 
+def today_expires_at(articles: list[NewsArticle]) -> float:
+    """Epoch time at which the today list changes without a write.
+
+    That is when the oldest article drops out of the 24 hour window, or at
+    local midnight when the response's date rolls over.
+    """
+    tomorrow = datetime.combine(date.today() + timedelta(days=1), datetime.min.time())
+    expiry = tomorrow.timestamp()
+    if articles:
+        oldest = min(a.created_at for a in articles)
+        if oldest.tzinfo is None:
+            oldest = oldest.replace(tzinfo=timezone.utc)  # SQLite drops the offset
+        expiry = min(expiry, (oldest + timedelta(hours=24)).timestamp())
+    return expiry
+
+
 async def get_audio_path(session: AsyncSession, article_id: str) -> Path | None:
     """Resolve the best available audio file for an article (parkiet > piper)."""
     stmt = select(NewsArticle).where(NewsArticle.id == article_id)
@@ -40,35 +77,148 @@ async def get_audio_path(session: AsyncSession, article_id: str) -> Path | None:
     return full_path
 
 
-async def create_article(
-    session: AsyncSession,
-    source: str,
-    title: str,
-    url: str,
-    published_at: datetime,
-    description: str = "",
-) -> NewsArticle:
-    """Create a new news article. Caller must handle duplicate URL check."""
-    article = NewsArticle(
-        source=source,
-        title=title,
-        url=url,
-        description=description,
-        published_at=published_at,
-    )
-    session.add(article)
-    await session.commit()
-    await session.refresh(article)
-    return article
+@dataclass(frozen=True)
+class BriefingTrack:
+    """One article's MP3 within the concatenated briefing stream.
 
+    `start` skips the file's ID3v2 tag, so the stream holds only MPEG frames;
+    `offset` is the track's position in the stream.
+    """
 
-async def save_audio(article_id: str, engine: str, audio_bytes: bytes) -> str:
-    """Save MP3 audio to disk. Returns the relative path."""
+    article: NewsArticle
+    quality: str
+    path: Path
+    start: int
+    length: int
+    offset: int
+
+
+def _audio_extent(path: Path) -> tuple[int, int] | None:
+    """Return (start, length) of the MPEG data in an MP3, or None if missing."""
+    try:
+        with path.open("rb") as f:
+            header = f.read(10)
+            size = os.fstat(f.fileno()).st_size
+    except FileNotFoundError:
+        return None
+    start = 0
+    if len(header) == 10 and header[:3] == b"ID3":
+        # Tag size is a 28-bit syncsafe integer, excluding the 10-byte header
+        start = 10 + sum((b & 0x7F) << (7 * (3 - i)) for i, b in enumerate(header[6:10]))
+        if header[5] & 0x10:
+            start += 10  # footer present
+    return (start, size - start) if size > start else None
+
+
+async def get_briefing(session: AsyncSession) -> list[BriefingTrack]:
+    """Today's rendered articles as a playlist, in the same order as the today list."""
+    candidates = []
+    for a in await get_today_articles(session):
+        if a.audio_parkiet:
+            candidates.append((a, "parkiet", AUDIO_BASE / a.audio_parkiet))
+        elif a.audio_piper:
+            candidates.append((a, "piper", AUDIO_BASE / a.audio_piper))
+
+    extents = await asyncio.to_thread(lambda: [_audio_extent(p) for _, _, p in candidates])
+    tracks = []
+    offset = 0
+    for (article, quality, path), extent in zip(candidates, extents):
+        if extent is None:
+            continue
+        start, length = extent
+        tracks.append(BriefingTrack(article, quality, path, start, length, offset))
+        offset += length
+    return tracks
+
+
+def briefing_etag(tracks: list[BriefingTrack]) -> str:
+    """Strong validator for the stream: changes whenever any track does."""
+    h = hashlib.sha256()
+    for t in tracks:
+        h.update(f"{t.path}:{t.start}:{t.length}\n".encode())
+    return f'"{h.hexdigest()[:32]}"'
+
+
+async def create_articles(
+    session: AsyncSession, items: list[NewsArticleCreate]
+) -> list[dict]:
+    """Insert articles in one transaction, skipping URLs that already exist.
+
+    Uses INSERT ... ON CONFLICT(url) DO NOTHING, so concurrent ingests of
+    the same URL can't race into the unique constraint. Returns
+    {"id", "duplicate"} per item, in input order.
+    """
+    now = datetime.now(timezone.utc)
+    new_ids: dict[str, str] = {}
+    rows = []
+    for item in items:
+        if item.url in new_ids:
+            continue
+        new_ids[item.url] = str(uuid.uuid4())
+        rows.append(
+            {
+                "id": new_ids[item.url],
+                "source": item.source,
+                "title": item.title,
+                "url": item.url,
+                "description": item.description,
+                "published_at": item.published_at,
+                "created_at": now,
+            }
+        )
+
+    row_chunk = SQLITE_MAX_VARIABLES // len(rows[0]) if rows else 1
+    for i in range(0, len(rows), row_chunk):
+        stmt = insert(NewsArticle).values(rows[i : i + row_chunk])
+        await session.execute(stmt.on_conflict_do_nothing(index_elements=["url"]))
+
+    urls = list(new_ids)
+    stored: dict[str, str] = {}
+    for i in range(0, len(urls), SQLITE_MAX_VARIABLES):
+        stmt = select(NewsArticle.url, NewsArticle.id).where(
+            NewsArticle.url.in_(urls[i : i + SQLITE_MAX_VARIABLES])
+        )
+        stored.update((await session.execute(stmt)).tuples().all())
+    await session.commit()
+    # Re-ingesting only known URLs changes nothing; keep the cached list
+    if any(stored[url] == article_id for url, article_id in new_ids.items()):
+        today_cache.invalidate()
+
+    results = []
+    claimed: set[str] = set()
+    for item in items:
+        article_id = stored[item.url]
+        # Only the first occurrence of a URL we inserted ourselves is new
+        duplicate = article_id != new_ids[item.url] or item.url in claimed
+        claimed.add(item.url)
+        results.append({"id": article_id, "duplicate": duplicate})
+    return results
+
+
+def _write_atomic(source: BinaryIO, full_path: Path) -> None:
+    """Copy source to a temp file next to full_path, then rename it into place.
+
+    Readers only ever see the final name, so a partial file is never visible.
+    """
+    full_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=full_path.parent, prefix=f".{full_path.name}.", suffix=".part"
+    )
+    try:
+        with os.fdopen(fd, "wb") as out:
+            source.seek(0)
+            shutil.copyfileobj(source, out, AUDIO_CHUNK)
+        os.replace(tmp_path, full_path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+async def save_audio(article_id: str, engine: str, source: BinaryIO) -> str:
+    """Stream MP3 audio to disk in a worker thread. Returns the relative path."""
     today = date.today().isoformat()
     rel_path = f"{today}/{article_id}_{engine}.mp3"
-    full_path = AUDIO_BASE / rel_path
-    full_path.parent.mkdir(parents=True, exist_ok=True)
-    full_path.write_bytes(audio_bytes)
+    await asyncio.to_thread(_write_atomic, source, AUDIO_BASE / rel_path)
     return rel_path
 
 
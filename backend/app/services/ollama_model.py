@@ -0,0 +1,144 @@
+"""Keeps the Ollama model loaded so the first request doesn't pay for the load.
+
+The app lifespan starts keep_model_loaded(): after OLLAMA_WARMUP_DELAY
+seconds it preloads MODEL, then re-sends keep_alive every
+OLLAMA_KEEPALIVE_INTERVAL seconds during OLLAMA_ACTIVE_HOURS. Outside those
+hours Ollama unloads the model once OLLAMA_KEEP_ALIVE expires, freeing VRAM.
+
+Preloading is a /api/generate call without a prompt: Ollama loads the model
+with NUM_CTX and sets its keep-alive without generating anything. The health
+prober fills in the load state from /api/ps. Each load also primes the
+classification prompt prefix (see classify_service), since a freshly loaded
+model starts with an empty prompt cache.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+
+import httpx
+
+from app.services.http_client import get_client, service_retry
+from app.services.ollama_scheduler import scheduler
+
+logger = logging.getLogger(__name__)
+
+OLLAMA_BASE = os.getenv("OLLAMA_BASE_URL", "http://ollama:11434")
+MODEL = os.getenv("OLLAMA_MODEL", "llama3:8b-instruct-q4_K_M")
+WARMUP_DELAY = float(os.getenv("OLLAMA_WARMUP_DELAY", "5"))
+KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+# Context size the model is loaded with; see inference_profiles
+NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "4096"))
+KEEPALIVE_INTERVAL = float(os.getenv("OLLAMA_KEEPALIVE_INTERVAL", "600"))
+# "HH:MM-HH:MM" in local time, may wrap past midnight; empty = always
+ACTIVE_HOURS = os.getenv("OLLAMA_ACTIVE_HOURS", "07:00-23:00")
+
+
+class ModelState:
+    def __init__(self) -> None:
+        self.warmup = "pending"  # pending | loading | ready | failed
+        self.warmup_ms: float | None = None
+        self.last_keepalive: datetime | None = None
+        self.loaded: bool | None = None  # from /api/ps; None = not checked yet
+        self.expires_at: str | None = None
+        self.size_vram: int | None = None
+
+    def update_from_ps(self, data: dict) -> None:
+        """Record whether MODEL is among the running models of /api/ps."""
+        running = {m.get("name") or m.get("model"): m for m in data.get("models", [])}
+        model = running.get(MODEL)
+        self.loaded = model is not None
+        self.expires_at = model.get("expires_at") if model else None
+        self.size_vram = model.get("size_vram") if model else None
+
+    def snapshot(self) -> dict:
+        return {
+            "model": MODEL,
+            "loaded": self.loaded,
+            "expires_at": self.expires_at,
+            "size_vram": self.size_vram,
+            "warmup": self.warmup,
+            "warmup_ms": self.warmup_ms,
+            "last_keepalive": self.last_keepalive.isoformat() if self.last_keepalive else None,
+            "active_hours": ACTIVE_HOURS or "always",
+        }
+
+
+state = ModelState()
+
+
+def in_active_hours(now: datetime, spec: str = ACTIVE_HOURS) -> bool:
+    """Whether local time `now` falls inside an "HH:MM-HH:MM" window."""
+    if not spec:
+        return True
+    start, _, end = spec.partition("-")
+    current = now.strftime("%H:%M")
+    if start <= end:
+        return start <= current < end
+    return current >= start or current < end
+
+
+@service_retry("ollama")
+async def _load_model() -> None:
+    """Load MODEL (if needed) and reset its keep-alive timer.
+
+    Takes a batch slot like any other call: a (re)load stalls Ollama for
+    generations too.
+    """
+    async with scheduler.slot("batch"):
+        resp = await get_client("ollama").post(
+            f"{OLLAMA_BASE}/api/generate",
+            json={"model": MODEL, "keep_alive": KEEP_ALIVE, "options": {"num_ctx": NUM_CTX}},
+        )
+    resp.raise_for_status()
+
+
+async def _prime_prompts(force: bool) -> None:
+    # Imported here: classify_service imports this module
+    from app.services.classify_service import prime_prefix
+
+    try:
+        await prime_prefix(force)
+    except httpx.HTTPError as e:
+        logger.warning("Priming the classify prompt failed: %s", e)
+
+
+async def warm_up() -> None:
+    """Preload the model after the configured delay."""
+    await asyncio.sleep(WARMUP_DELAY)
+    state.warmup = "loading"
+    start = time.monotonic()
+    try:
+        await _load_model()
+    except httpx.HTTPError as e:
+        state.warmup = "failed"
+        logger.warning("Ollama warm-up of %s failed: %s", MODEL, e)
+        return
+    state.warmup = "ready"
+    state.warmup_ms = round((time.monotonic() - start) * 1000, 1)
+    state.last_keepalive = datetime.now().astimezone()
+    logger.info("Ollama model %s loaded in %.0f ms", MODEL, state.warmup_ms)
+    await _prime_prompts(force=True)
+
+
+async def keep_model_loaded() -> None:
+    """Warm up, then keep the model loaded during active hours. Run from lifespan."""
+    await warm_up()
+    while True:
+        await asyncio.sleep(KEEPALIVE_INTERVAL)
+        now = datetime.now().astimezone()
+        if not in_active_hours(now):
+            continue
+        # Unloaded since the last check (e.g. overnight): the prompt cache is gone
+        reloading = state.loaded is False or state.warmup != "ready"
+        try:
+            await _load_model()
+        except httpx.HTTPError as e:
+            logger.warning("Ollama keep-alive for %s failed: %s", MODEL, e)
+            continue
+        if state.warmup != "ready":
+            state.warmup = "ready"
+        state.last_keepalive = now
+        await _prime_prompts(force=reloading)
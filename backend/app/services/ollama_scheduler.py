@@ -0,0 +1,130 @@
+"""Priority-aware admission control for the single Ollama instance.
+
+Every generation call (classify, chat, summarize) and every model load
+(preload, keep-alive) takes a slot first. Health probes of /api/ps don't:
+they only read state and must answer while Ollama is busy.
+
+At most OLLAMA_CONCURRENCY calls run at once; waiting callers are served
+by priority class (interactive before batch), FIFO within a class.
+Queue-wait time is recorded per class.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from app.services import timing
+
+logger = logging.getLogger(__name__)
+
+# Lower value = served first
+PRIORITIES: dict[str, int] = {"interactive": 0, "batch": 1}
+
+
+class _ClassStats:
+    def __init__(self) -> None:
+        self.waiting = 0
+        self.served = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.recent: deque[float] = deque(maxlen=500)
+
+    def record(self, wait: float) -> None:
+        self.served += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        self.recent.append(wait)
+
+    def snapshot(self) -> dict:
+        recent = sorted(self.recent)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+        return {
+            "waiting": self.waiting,
+            "served": self.served,
+            "wait_avg_ms": round(self.wait_total / self.served * 1000, 1) if self.served else 0.0,
+            "wait_p95_ms": round(p95 * 1000, 1),
+            "wait_max_ms": round(self.wait_max * 1000, 1),
+        }
+
+
+class Slot:
+    """A granted slot. release() is idempotent; a dropped slot releases itself."""
+
+    def __init__(self, scheduler: "OllamaScheduler") -> None:
+        self._scheduler: OllamaScheduler | None = scheduler
+
+    def release(self) -> None:
+        if self._scheduler is not None:
+            scheduler, self._scheduler = self._scheduler, None
+            scheduler._release()
+
+    def __del__(self) -> None:
+        if self._scheduler is not None:
+            logger.warning("Ollama slot was never released, releasing on cleanup")
+            self.release()
+
+
+class OllamaScheduler:
+    def __init__(self, concurrency: int) -> None:
+        self.concurrency = concurrency
+        self._free = concurrency
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._stats = {name: _ClassStats() for name in PRIORITIES}
+
+    async def acquire(self, priority: str) -> Slot:
+        """Wait for a free slot. The caller must release() it."""
+        stats = self._stats[priority]
+        start = time.monotonic()
+        if self._free > 0 and not self._waiters:
+            self._free -= 1
+        else:
+            fut = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (PRIORITIES[priority], next(self._seq), fut))
+            stats.waiting += 1
+            try:
+                await fut
+            except asyncio.CancelledError:
+                # Slot handed over just as we were cancelled: pass it on
+                if fut.done() and not fut.cancelled():
+                    self._release()
+                raise
+            finally:
+                stats.waiting -= 1
+        wait = time.monotonic() - start
+        stats.record(wait)
+        timing.record("ollama_queue", wait)
+        return Slot(self)
+
+    def _release(self) -> None:
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self._free += 1
+
+    @asynccontextmanager
+    async def slot(self, priority: str):
+        """Hold a slot for the duration of the block."""
+        slot = await self.acquire(priority)
+        try:
+            yield
+        finally:
+            slot.release()
+
+    def stats(self) -> dict:
+        """Concurrency usage and queue-wait statistics per priority class."""
+        return {
+            "concurrency": self.concurrency,
+            "in_use": self.concurrency - self._free,
+            "classes": {name: s.snapshot() for name, s in self._stats.items()},
+        }
+
+
+scheduler = OllamaScheduler(int(os.getenv("OLLAMA_CONCURRENCY", "2")))
@@ -0,0 +1,165 @@
+"""Per-request timing breakdown, returned in a Server-Timing header.
+
+ServerTimingMiddleware puts a RequestTimings in a context variable for the
+duration of each HTTP request. Instrumentation anywhere below it calls
+record(name, seconds); outside a request that is a no-op. Spans are summed
+per name, so the header stays short:
+
+    Server-Timing: db;desc="3x";dur=1.8, ollama;desc="1x";dur=812.4, app;dur=820.1
+
+Recorded spans: db_open (first connection of a session), db (each query),
+<service> (each service_retry attempt), <service>_http (each pooled HTTP
+call, until headers), ollama_queue (wait for a scheduler slot) and
+ollama_prompt_eval / ollama_eval (prompt and generation time as reported by
+Ollama). With TIMING_LOG=1 every request also logs one JSON line with the
+same data.
+"""
+
+import json
+import logging
+import os
+import time
+from contextvars import ContextVar
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+SERVER_TIMING = os.getenv("SERVER_TIMING", "1") == "1"
+TIMING_LOG = os.getenv("TIMING_LOG", "0") == "1"
+
+
+class RequestTimings:
+    def __init__(self) -> None:
+        self.spans: dict[str, list[float]] = {}  # name -> [total seconds, count]
+
+    def add(self, name: str, seconds: float) -> None:
+        span = self.spans.get(name)
+        if span is None:
+            self.spans[name] = [seconds, 1]
+        else:
+            span[0] += seconds
+            span[1] += 1
+
+    def header(self, total: float) -> str:
+        parts = [f'{name};desc="{int(n)}x";dur={s * 1000:.1f}' for name, (s, n) in self.spans.items()]
+        parts.append(f"app;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+def record(name: str, seconds: float) -> None:
+    """Add a span to the current request, if any."""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+# --- httpx event hooks (installed on every pooled client) ---
+
+
+def http_hooks(service: str) -> dict:
+    """Event hooks that record each request of a pooled client as <service>_http."""
+    name = f"{service}_http"
+
+    async def on_request(request: httpx.Request) -> None:
+        request.extensions["timing_start"] = time.perf_counter()
+
+    async def on_response(response: httpx.Response) -> None:
+        start = response.request.extensions.get("timing_start")
+        if start is not None:
+            record(name, time.perf_counter() - start)
+
+    return {"request": [on_request], "response": [on_response]}
+
+
+# --- SQLAlchemy events ---
+# These run in SQLAlchemy's greenlet, which carries the caller's context.
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info["timing_query_start"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    start = conn.info.pop("timing_query_start", None)
+    if start is not None:
+        record("db", time.perf_counter() - start)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _before_session_execute(state) -> None:
+    session = state.session
+    if _current.get() is not None and not session.in_transaction():
+        session.info["timing_open_start"] = time.perf_counter()
+
+
+@event.listens_for(Session, "after_begin")
+def _after_session_begin(session, transaction, connection) -> None:
+    start = session.info.pop("timing_open_start", None)
+    if start is not None:
+        record("db_open", time.perf_counter() - start)
+
+
+# --- ASGI middleware ---
+
+
+class ServerTimingMiddleware:
+    """Collect spans per request and add them as a Server-Timing header.
+
+    Streaming responses carry the spans recorded before their headers went
+    out; the log line covers the whole request.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not (SERVER_TIMING or TIMING_LOG):
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def timed_send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if SERVER_TIMING:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", timings.header(time.perf_counter() - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            _current.reset(token)
+            if TIMING_LOG:
+                logger.info(
+                    "request_timing %s",
+                    json.dumps(
+                        {
+                            "method": scope["method"],
+                            "path": scope["path"],
+                            "status": status,
+                            "total_ms": round((time.perf_counter() - start) * 1000, 1),
+                            "spans": {
+                                name: {"ms": round(s * 1000, 1), "count": int(n)}
+                                for name, (s, n) in timings.spans.items()
+                            },
+                        }
+                    ),
+                )
@@ -0,0 +1,101 @@
+"""What priming the classify prompt prefix saves after a model load.
+
+Classifies the corpus utterances through the LLM path (fast path and cache
+bypassed) on a freshly started stub, i.e. a freshly loaded model with an
+empty prompt cache, and reports first-call and median latency plus the
+prompt tokens and prompt-eval time Ollama reported per call. The stub keeps
+its prompt cache on in both runs, as Ollama does; they differ only in
+whether prime_prefix() ran before the first call. With --interleave a chat
+call goes between classifications and pushes the prefix out of the stub's
+single cache slot. With --ollama the primed variant runs against a real
+server (restart or unload the model first for a cold start).
+
+Usage (from backend/):
+    python -m bench.classify_prefix
+    python -m bench.classify_prefix --interleave
+    python -m bench.classify_prefix --ollama http://localhost:11434
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from pathlib import Path
+
+from app.services import classify_service
+from app.services.http_client import close_clients, get_client
+from app.services.ollama_model import MODEL
+from bench.stubs import StubConfig, ollama_stub, serve
+
+CORPUS = Path(__file__).parent / "intent_corpus.jsonl"
+CHAT = {"role": "user", "content": "Wat is de hoofdstad van Nederland?"}
+
+
+async def _run(base: str, texts: list[str], prime: bool, interleave: bool) -> dict:
+    classify_service.OLLAMA_BASE = base
+    classify_service.FAST_PATH_THRESHOLD = float("inf")
+    classify_service._cache.clear()
+    classify_service._prefix = classify_service.PrefixState()
+
+    if prime:
+        await classify_service.prime_prefix()
+    latencies = []
+    for text in texts:
+        if interleave:
+            await get_client("ollama").post(
+                f"{base}/api/chat", json={"model": MODEL, "messages": [CHAT], "stream": False}
+            )
+        start = time.perf_counter()
+        await classify_service.classify(text)
+        latencies.append(time.perf_counter() - start)
+    return {
+        "first_s": latencies[0],
+        "median_s": statistics.median(latencies),
+        **classify_service.prefix_stats(),
+    }
+
+
+def _print(name: str, r: dict) -> None:
+    # Reuse is only known once priming measured the prefix size
+    reused = f"{r['reused']}/{r['calls']}" if r["prefix_tokens"] else "-"
+    print(
+        f"  {name:<10} {r['first_s'] * 1000:8.1f}ms {r['median_s'] * 1000:8.1f}ms"
+        f" {r['avg_prompt_eval_count']:>10} {r['avg_prompt_eval_ms']:>8}ms"
+        f" {reused:>7}"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    corpus = [json.loads(line) for line in CORPUS.read_text(encoding="utf-8").splitlines() if line]
+    texts = [item["text"] for item in corpus][: args.requests]
+
+    print(f"requests={len(texts)} fingerprint={classify_service.PREFIX_FINGERPRINT}")
+    print(
+        f"  {'variant':<10} {'first':>10} {'p50':>10} {'prompt tok':>10}"
+        f" {'prompt':>10} {'reused':>7}"
+    )
+    if args.ollama:
+        _print("primed", await _run(args.ollama, texts, True, args.interleave))
+    else:
+        for name, prime in (("unprimed", False), ("primed", True)):
+            cfg = StubConfig(
+                latency=0.02,
+                token_delay=0.01,
+                reply_tokens=60,
+                prompt_token_delay=args.prompt_token_delay,
+            )
+            async with serve(ollama_stub(config=cfg)) as base:
+                _print(name, await _run(base, texts, prime, args.interleave))
+    await close_clients()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Classify prompt-prefix reuse")
+    parser.add_argument("--requests", type=int, default=20, help="corpus utterances to classify")
+    parser.add_argument("--ollama", help="real Ollama URL instead of the stub")
+    parser.add_argument("--interleave", action="store_true", help="chat call between classifies")
+    parser.add_argument(
+        "--prompt-token-delay", type=float, default=0.0005, help="stub seconds per prompt token"
+    )
+    asyncio.run(main(parser.parse_args()))
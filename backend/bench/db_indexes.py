@@ -0,0 +1,145 @@
+"""Benchmark: hot queries on large tables before and after the index migration.
+
+Builds a temporary SQLite database with the pre-index schema, fills it with
+synthetic news articles and flow executions, times the real service queries,
+applies app.migrations and times them again.
+
+Rows are spread over --days, so the defaults model ~100 articles a day
+with a long (raised) retention. The retention delete removes the oldest
+day, as the daily cleanup run does.
+
+Usage (from backend/):
+    python -m bench.db_indexes                  # 300k rows per table over 3000 days
+    python -m bench.db_indexes --rows 100000 --days 365
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401 — register all tables
+from app.database import Base
+from app.migrations import run_migrations
+from app.models.flow import FlowExecution
+from app.models.news import NewsArticle
+from app.services.news_service import get_today_articles
+
+DAYS = 3000
+
+
+def _fill(path: str, rows: int) -> None:
+    """Insert synthetic rows spread evenly over the last DAYS days."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    fmt = "%Y-%m-%d %H:%M:%S.%f"
+    step = timedelta(days=DAYS) / rows
+
+    def news(i: int):
+        created = now - step * i
+        return (
+            str(uuid.uuid4()), "nos", f"Artikel {i}", f"https://example.nl/{i}", "tekst",
+            (created - timedelta(hours=1)).strftime(fmt), created.strftime(fmt),
+        )
+
+    def flow(i: int):
+        created = now - step * i
+        status = "pending" if i % 1000 == 0 else "success"
+        return (str(uuid.uuid4()), "whatsapp", "{}", "tekst", status,
+                created.strftime(fmt), created.strftime(fmt))
+
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO news_articles (id, source, title, url, description, published_at, created_at)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (news(i) for i in range(rows)),
+    )
+    conn.executemany(
+        "INSERT INTO flow_executions (id, intent, params_json, source_text, status, created_at, updated_at)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (flow(i) for i in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+
+
+async def _time(label: str, session_factory, fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        async with session_factory() as session:
+            start = time.perf_counter()
+            await fn(session)
+            best = min(best, time.perf_counter() - start)
+            await session.rollback()
+    return best
+
+
+async def _today(session: AsyncSession) -> None:
+    await get_today_articles(session)
+
+
+async def _cleanup(session: AsyncSession) -> None:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=DAYS - 1)
+    await session.execute(delete(NewsArticle).where(NewsArticle.created_at < cutoff))
+
+
+async def _pending_flows(session: AsyncSession) -> None:
+    stmt = (
+        select(FlowExecution.id)
+        .where(FlowExecution.status == "pending")
+        .order_by(FlowExecution.created_at)
+    )
+    (await session.execute(stmt)).scalars().all()
+
+
+QUERIES = [
+    ("news today (created_at filter, published_at sort)", _today),
+    ("retention delete, oldest day (created_at)", _cleanup),
+    ("pending flow executions (status, created_at)", _pending_flows),
+]
+
+
+async def main(rows: int, days: int) -> None:
+    global DAYS
+    DAYS = days
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+        # Pre-index schema: current tables with their indexes dropped
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    await conn.exec_driver_sql(f"DROP INDEX {index.name}")
+
+        print(f"Filling {rows} news articles + {rows} flow executions over {days} days...")
+        _fill(path, rows)
+
+        before = [await _time(label, sessions, fn) for label, fn in QUERIES]
+        async with engine.begin() as conn:
+            start = time.perf_counter()
+            await run_migrations(conn)
+            migrate = time.perf_counter() - start
+        after = [await _time(label, sessions, fn) for label, fn in QUERIES]
+        await engine.dispose()
+
+    print(f"migration applied in {migrate * 1000:.0f} ms\n")
+    print(f"{'query':52} {'before':>10} {'after':>10}")
+    for (label, _), b, a in zip(QUERIES, before, after):
+        print(f"{label:52} {b * 1000:8.1f}ms {a * 1000:8.1f}ms  ({b / a:.0f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index migration benchmark")
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--days", type=int, default=DAYS, help="Time span the rows cover")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.days))
@@ -0,0 +1,67 @@
+"""Benchmark: fresh httpx.AsyncClient per call vs the pooled service client.
+
+Runs both patterns against a local Ollama stub and prints requests/sec.
+
+Usage (from backend/):
+    python -m bench.http_pool                       # 2000 requests, concurrency 20
+    python -m bench.http_pool --requests 5000 --concurrency 50 --latency 0.005
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from app.services.http_client import close_clients, get_client
+from bench.stubs import ollama_stub, serve
+
+PAYLOAD = {"model": "stub", "messages": [{"role": "user", "content": "hallo"}], "stream": False}
+
+
+async def _fresh_client(url: str) -> None:
+    """The old pattern: new client (and TCP connection) per request."""
+    async with httpx.AsyncClient(timeout=120) as client:
+        resp = await client.post(url, json=PAYLOAD)
+        resp.raise_for_status()
+
+
+async def _pooled_client(url: str) -> None:
+    resp = await get_client("ollama").post(url, json=PAYLOAD)
+    resp.raise_for_status()
+
+
+async def _run(call, url: str, requests: int, concurrency: int) -> float:
+    """Fire `requests` calls with bounded concurrency. Returns requests/sec."""
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with sem:
+            await call(url)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+async def main(requests: int, concurrency: int, latency: float) -> None:
+    async with serve(ollama_stub(latency)) as base:
+        url = f"{base}/api/chat"
+        await _run(_pooled_client, url, 50, concurrency)  # warm-up
+
+        before = await _run(_fresh_client, url, requests, concurrency)
+        after = await _run(_pooled_client, url, requests, concurrency)
+        await close_clients()
+
+    print(f"requests={requests} concurrency={concurrency} stub_latency={latency * 1000:.0f}ms")
+    print(f"  per-call client : {before:8.1f} req/s")
+    print(f"  pooled client   : {after:8.1f} req/s  ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pooled HTTP client benchmark")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub latency in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.latency))
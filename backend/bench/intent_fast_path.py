@@ -0,0 +1,95 @@
+"""Measure coverage and accuracy of the rule-based intent fast path.
+
+Runs every utterance of the labelled corpus (intent_corpus.jsonl) through
+intent_rules.match and reports which share of the traffic the fast path
+answers on its own and how often it is right. Labelled params count,
+including the bericht/tekst that would actually be sent or saved. Entries
+marked "near_miss" resemble a rule but must go to the LLM; a fast-path
+answer for one counts as wrong. With --llm every utterance is also
+classified by Ollama, to compare fast-path agreement with the LLM.
+
+Usage (from backend/):
+    python -m bench.intent_fast_path
+    python -m bench.intent_fast_path --llm --verbose     # needs OLLAMA_BASE_URL
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from app.services import classify_service, intent_rules
+
+CORPUS = Path(__file__).parent / "intent_corpus.jsonl"
+
+
+def _same(a: str, b: str) -> bool:
+    """Equal apart from case and trailing punctuation."""
+    return a.casefold().rstrip(".!?").strip() == b.casefold().rstrip(".!?").strip()
+
+
+def _correct(result: dict, label: dict) -> bool:
+    """Intent must match; labelled params (contact, bericht, tekst, ...) too."""
+    if result["intent"] != label["intent"]:
+        return False
+    params = result.get("params", {})
+    return all(_same(str(params.get(k, "")), v) for k, v in label["params"].items())
+
+
+async def _llm(text: str) -> dict:
+    """Classify via the LLM path only, bypassing fast path and cache."""
+    threshold = classify_service.FAST_PATH_THRESHOLD
+    classify_service.FAST_PATH_THRESHOLD = float("inf")
+    classify_service._cache.clear()
+    try:
+        return await classify_service.classify(text)
+    finally:
+        classify_service.FAST_PATH_THRESHOLD = threshold
+
+
+async def main(use_llm: bool, verbose: bool) -> None:
+    corpus = [json.loads(line) for line in CORPUS.read_text(encoding="utf-8").splitlines() if line]
+
+    covered = correct = llm_correct = agree = 0
+    elapsed = 0.0
+    for item in corpus:
+        start = time.perf_counter()
+        fast = intent_rules.match(item["text"])
+        elapsed += time.perf_counter() - start
+        hit = fast is not None and fast["confidence"] >= classify_service.FAST_PATH_THRESHOLD
+
+        llm = await _llm(item["text"]) if use_llm else None
+        if llm is not None and _correct(llm, item):
+            llm_correct += 1
+
+        if hit:
+            covered += 1
+            ok = not item.get("near_miss") and _correct(fast, item)
+            correct += ok
+            if llm is not None and llm["intent"] == fast["intent"]:
+                agree += 1
+            if verbose or not ok:
+                mark = "ok " if ok else "BAD"
+                print(f"  {mark} {item['text']!r} -> {fast['intent']} {fast['params']}")
+        elif verbose:
+            print(f"  --  {item['text']!r} -> LLM")
+
+    total = len(corpus)
+    print(f"corpus            : {total} utterances")
+    print(f"fast-path coverage: {covered}/{total} ({covered / total:.0%})")
+    if covered:
+        print(f"fast-path accuracy: {correct}/{covered} ({correct / covered:.0%})")
+    print(f"mean match time   : {elapsed / total * 1e6:.1f} µs")
+    if use_llm:
+        print(f"LLM accuracy      : {llm_correct}/{total} ({llm_correct / total:.0%})")
+        if covered:
+            print(f"fast path = LLM   : {agree}/{covered} intents agree")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Intent fast-path coverage and accuracy")
+    parser.add_argument("--llm", action="store_true", help="Also classify via Ollama")
+    parser.add_argument("--verbose", action="store_true", help="Print every utterance")
+    args = parser.parse_args()
+    asyncio.run(main(args.llm, args.verbose))
@@ -0,0 +1,96 @@
+"""Compare Ollama latency per task with model defaults vs its inference profile.
+
+For classify, summarize and chat, sends the task's request once without
+options (model defaults) and once with its profile from inference_profiles,
+--requests times each, and prints median latency and generated tokens.
+
+Against the stub, a reply costs --token-delay per generated token and runs
+to --reply-tokens unless num_predict caps it, like a model that doesn't stop
+on its own. Point --ollama at a real server for real numbers.
+
+Usage (from backend/):
+    python -m bench.profiles
+    python -m bench.profiles --token-delay 0.02 --reply-tokens 500
+    python -m bench.profiles --ollama http://localhost:11434 --requests 5
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from contextlib import AsyncExitStack
+
+from app.services.classify_service import CLASSIFY_SYSTEM
+from app.services.http_client import close_clients, get_client
+from app.services.inference_profiles import profile
+from app.services.llm_service import SUMMARIZE_SYSTEM
+from app.services.ollama_model import MODEL
+from bench.stubs import StubConfig, ollama_stub, serve
+
+ARTICLE = " ".join(
+    f"Zin {i} van het artikel gaat over het nieuws van vandaag in Nederland." for i in range(40)
+)
+
+TASKS = {
+    "classify": (
+        [
+            {"role": "system", "content": CLASSIFY_SYSTEM},
+            {"role": "user", "content": "stuur een whatsapp aan Peter dat ik wat later kom"},
+        ],
+        {"format": "json"},
+    ),
+    "summarize": (
+        [
+            {"role": "system", "content": SUMMARIZE_SYSTEM},
+            {"role": "user", "content": ARTICLE},
+        ],
+        {},
+    ),
+    "chat": ([{"role": "user", "content": "Wat is de hoofdstad van Nederland?"}], {}),
+}
+
+
+async def _measure(base: str, payload: dict, requests: int) -> tuple[float, int]:
+    """Median latency in seconds and tokens generated by the last call."""
+    latencies = []
+    tokens = 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        resp = await get_client("ollama").post(f"{base}/api/chat", json=payload)
+        resp.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        tokens = resp.json().get("eval_count", 0)
+    return statistics.median(latencies), tokens
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with AsyncExitStack() as stack:
+        base = args.ollama
+        if not base:
+            cfg = StubConfig(
+                latency=0.05, token_delay=args.token_delay, reply_tokens=args.reply_tokens
+            )
+            base = await stack.enter_async_context(serve(ollama_stub(config=cfg)))
+
+        print(f"ollama={base} model={MODEL} requests={args.requests}")
+        print(f"  {'task':<10} {'defaults':>10} {'profile':>10} {'tokens':>12}")
+        for name, (messages, extra) in TASKS.items():
+            payload = {"model": MODEL, "messages": messages, "stream": False, **extra}
+            before, before_tokens = await _measure(base, payload, args.requests)
+            after, after_tokens = await _measure(
+                base, profile(name).apply(dict(payload)), args.requests
+            )
+            print(
+                f"  {name:<10} {before * 1000:8.0f}ms {after * 1000:8.0f}ms"
+                f" {before_tokens:>5} -> {after_tokens:<5}"
+            )
+        await close_clients()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inference profile latency per task")
+    parser.add_argument("--requests", type=int, default=3, help="calls per task and variant")
+    parser.add_argument("--ollama", help="real Ollama URL instead of the stub")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="stub seconds per token")
+    parser.add_argument("--reply-tokens", type=int, default=600, help="stub uncapped reply length")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,143 @@
+"""Stress test: concurrent SQLite readers and writers, default vs tuned engine.
+
+Runs writer tasks (article ingest, flow executions, preference updates) and
+reader tasks (/api/news/today query over a fixed set of 100 articles)
+against a temporary database for a fixed time: once with driver defaults
+on a single engine, once with the tuned SQLiteProfile plus reader pool.
+Reports throughput, p95 latency and "database is locked" errors.
+
+Usage (from backend/):
+    python -m bench.sqlite_stress
+    python -m bench.sqlite_stress --writers 8 --readers 16 --seconds 20
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+import app.models  # noqa: F401 — register all tables
+from app.database import Base, SQLiteProfile, create_engines
+from app.models.news import NewsArticle, NewsPreferences
+from app.services.flow_service import create_execution
+from app.services.news_service import get_today_articles, update_preferences
+
+
+class Counters:
+    def __init__(self) -> None:
+        self.read_latency: list[float] = []
+        self.write_latency: list[float] = []
+        self.locked = 0
+
+
+def _p95(samples: list[float]) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000 if samples else 0.0
+
+
+async def _writer(n: int, sessions, counters: Counters, deadline: float) -> None:
+    # Ingested articles are backdated so the readers' window stays constant
+    old = datetime.now(timezone.utc) - timedelta(days=3)
+    i = 0
+    while time.monotonic() < deadline:
+        i += 1
+        start = time.perf_counter()
+        try:
+            async with sessions() as session:
+                session.add(
+                    NewsArticle(
+                        source="bench",
+                        title=f"Artikel {n}-{i}",
+                        url=f"https://example.nl/{n}/{i}",
+                        description="tekst " * 50,
+                        published_at=old,
+                        created_at=old,
+                    )
+                )
+                await session.commit()
+                execution = await create_execution(session, "aantekening", {}, "tekst")
+                execution.status = "success"
+                await session.commit()
+                await update_preferences(session, [f"https://feed/{i}"], 20, [])
+            counters.write_latency.append(time.perf_counter() - start)
+        except OperationalError as e:
+            if "locked" not in str(e):
+                raise
+            counters.locked += 1
+
+
+async def _reader(read_sessions, counters: Counters, deadline: float) -> None:
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            async with read_sessions() as session:
+                await get_today_articles(session)
+            counters.read_latency.append(time.perf_counter() - start)
+        except OperationalError as e:
+            if "locked" not in str(e):
+                raise
+            counters.locked += 1
+
+
+async def _seed(sessions) -> None:
+    async with sessions() as session:
+        now = datetime.now(timezone.utc)
+        session.add_all(
+            NewsArticle(
+                source="seed",
+                title=f"Vandaag {i}",
+                url=f"https://example.nl/vandaag/{i}",
+                published_at=now,
+            )
+            for i in range(100)
+        )
+        session.add(NewsPreferences(id=1))
+        await session.commit()
+
+
+async def _run(profile: SQLiteProfile | None, writers: int, readers: int, seconds: float) -> Counters:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'stress.db')}"
+        engine, read_engine = create_engines(url, profile)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        read_sessions = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+        await _seed(sessions)
+        counters = Counters()
+        deadline = time.monotonic() + seconds
+        await asyncio.gather(
+            *(_writer(n, sessions, counters, deadline) for n in range(writers)),
+            *(_reader(read_sessions, counters, deadline) for _ in range(readers)),
+        )
+        await engine.dispose()
+        await read_engine.dispose()
+    return counters
+
+
+async def main(writers: int, readers: int, seconds: float) -> None:
+    print(f"writers={writers} readers={readers} duration={seconds:.0f}s per run\n")
+    print(
+        f"{'engine':8} {'writes/s':>9} {'write p95':>10} {'reads/s':>9} {'read p95':>10} {'locked':>7}"
+    )
+    for label, profile in (("default", None), ("tuned", SQLiteProfile())):
+        c = await _run(profile, writers, readers, seconds)
+        print(
+            f"{label:8} {len(c.write_latency) / seconds:9.1f} {_p95(c.write_latency):8.1f}ms"
+            f" {len(c.read_latency) / seconds:9.1f} {_p95(c.read_latency):8.1f}ms {c.locked:7d}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SQLite concurrency stress test")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.writers, args.readers, args.seconds))
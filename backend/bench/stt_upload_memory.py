@@ -0,0 +1,67 @@
+"""Benchmark: backend memory while proxying a large WAV through /api/stt.
+
+Serves the real app and an STT stub in-process, uploads a synthetic WAV and
+reports the peak Python heap growth (tracemalloc) during the request. With
+the streamed proxy the peak stays in the order of the chunk size, not the
+file size.
+
+Usage (from backend/):
+    python -m bench.stt_upload_memory              # 50 MB WAV
+    python -m bench.stt_upload_memory --size-mb 20
+"""
+
+import argparse
+import asyncio
+import os
+import struct
+import tempfile
+import tracemalloc
+
+import httpx
+
+from bench.stubs import serve, stt_stub
+
+
+def _write_wav(path: str, size_mb: int, sample_rate: int = 48000) -> int:
+    """Write a mono 16-bit PCM WAV of roughly size_mb. Returns file size."""
+    data_bytes = size_mb * 1024 * 1024
+    block = struct.pack("<h", 1000) * 32768
+    with open(path, "wb") as f:
+        f.write(b"RIFF" + struct.pack("<I", 36 + data_bytes) + b"WAVE")
+        f.write(b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16))
+        f.write(b"data" + struct.pack("<I", data_bytes))
+        for _ in range(data_bytes // len(block)):
+            f.write(block)
+    return 44 + data_bytes
+
+
+async def main(size_mb: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        wav = os.path.join(tmp, "large.wav")
+        size = _write_wav(wav, size_mb)
+
+        async with serve(stt_stub()) as stt_base:
+            os.environ["STT_URL"] = f"{stt_base}/api/stt"
+            from app.main import app
+
+            async with serve(app, lifespan="off") as backend:
+                async with httpx.AsyncClient(timeout=600) as client:
+                    tracemalloc.start()
+                    with open(wav, "rb") as f:
+                        resp = await client.post(
+                            f"{backend}/api/stt", files={"audio": ("large.wav", f, "audio/wav")}
+                        )
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+
+    resp.raise_for_status()
+    print(f"upload size      : {size / 2**20:8.1f} MB")
+    print(f"stub received    : {resp.json()['bytes_received'] / 2**20:8.1f} MB")
+    print(f"peak heap growth : {peak / 2**20:8.1f} MB  ({peak / size:.1%} of upload)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="STT upload proxy memory benchmark")
+    parser.add_argument("--size-mb", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.size_mb))
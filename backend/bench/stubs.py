@@ -0,0 +1,264 @@
+"""In-process stub servers for benchmarking without the real downstream services.
+
+Each stub is a small FastAPI app served by uvicorn on a free localhost port,
+inside the benchmark's own event loop. Behaviour is set per stub with a
+StubConfig: base latency plus jitter, an error rate (answered with 503), and
+for streamed replies the number of chunks and the delay between them.
+
+The Ollama stub also models what inference profiles change: with token_delay
+set, a reply takes that long per generated token, capped by the request's
+num_predict; a request for a different num_ctx than the loaded one costs
+reload_delay, as Ollama reloads the model for it. With prompt_token_delay set,
+prompt processing costs that long per prompt token (~4 characters), minus
+the prefix shared with the previous prompt, like Ollama's prompt cache. Replies
+carry Ollama's prompt_eval_count/_duration and eval_count/_duration fields.
+"""
+
+import asyncio
+import json
+import os
+import random
+import socket
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+@dataclass
+class StubConfig:
+    latency: float = 0.0  # seconds before the reply or its first chunk
+    jitter: float = 0.0  # latency varies uniformly by +/- this much
+    error_rate: float = 0.0  # fraction of calls answered with 503
+    chunks: int = 8  # chunks/tokens in a streamed reply
+    chunk_delay: float = 0.0  # seconds between streamed chunks
+    token_delay: float = 0.0  # Ollama: seconds per generated token (non-streamed)
+    reply_tokens: int = 200  # Ollama: tokens in a reply without num_predict cap
+    reload_delay: float = 0.0  # Ollama: seconds to reload for another num_ctx
+    prompt_token_delay: float = 0.0  # Ollama: seconds per evaluated prompt token
+    prefix_cache: bool = True  # Ollama: skip the prefix shared with the previous prompt
+
+    async def wait(self) -> None:
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def failed(self) -> JSONResponse | None:
+        """A 503 response for the configured share of calls, else None."""
+        if self.error_rate and random.random() < self.error_rate:
+            return JSONResponse({"error": "stub failure"}, status_code=503)
+        return None
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _health(app: FastAPI, path: str) -> None:
+    @app.get(path)
+    async def health() -> dict:
+        return {"status": "ok"}
+
+
+def ollama_stub(latency: float = 0.0, config: StubConfig | None = None) -> FastAPI:
+    """Ollama /api/chat stub: a fixed JSON reply, or NDJSON tokens when streaming."""
+    cfg = config or StubConfig(latency=latency)
+    app = FastAPI()
+    reply = '{"intent": "aantekening"}'
+    loaded: dict[str, dict] = {}
+    previous = {"prompt": ""}
+
+    async def load(body: dict) -> None:
+        num_ctx = body.get("options", {}).get("num_ctx", 2048)
+        model = loaded.get(body["model"])
+        if model is not None and model["context_length"] != num_ctx and cfg.reload_delay:
+            await asyncio.sleep(cfg.reload_delay)
+        loaded[body["model"]] = {
+            "name": body["model"],
+            "model": body["model"],
+            "size_vram": 0,
+            "context_length": num_ctx,
+        }
+
+    def output_tokens(body: dict, available: int) -> int:
+        num_predict = body.get("options", {}).get("num_predict")
+        if num_predict is None or num_predict < 0:
+            return available
+        return min(num_predict, available)
+
+    async def evaluate_prompt(body: dict) -> dict:
+        """Process the prompt; returns Ollama's prompt_eval fields."""
+        prompt = "".join(f"<{m['role']}>{m['content']}" for m in body.get("messages", []))
+        shared = len(os.path.commonprefix([prompt, previous["prompt"]])) if cfg.prefix_cache else 0
+        previous["prompt"] = prompt
+        count = max(1, (len(prompt) - shared) // 4)
+        if cfg.prompt_token_delay:
+            await asyncio.sleep(count * cfg.prompt_token_delay)
+        return {
+            "prompt_eval_count": count,
+            "prompt_eval_duration": int(count * cfg.prompt_token_delay * 1e9),
+        }
+
+    @app.post("/api/chat")
+    async def chat(body: dict):
+        await load(body)
+        await cfg.wait()
+        if failure := cfg.failed():
+            return failure
+        prompt_eval = await evaluate_prompt(body)
+        if not body.get("stream"):
+            tokens = output_tokens(body, cfg.reply_tokens)
+            if cfg.token_delay:
+                await asyncio.sleep(tokens * cfg.token_delay)
+            return {
+                "model": body.get("model"),
+                "message": {"role": "assistant", "content": reply},
+                "done": True,
+                **prompt_eval,
+                "eval_count": tokens,
+                "eval_duration": int(tokens * cfg.token_delay * 1e9),
+            }
+
+        chunks = output_tokens(body, cfg.chunks)
+
+        async def tokens():
+            for i in range(chunks):
+                if i and cfg.chunk_delay:
+                    await asyncio.sleep(cfg.chunk_delay)
+                message = {"role": "assistant", "content": f"woord{i} "}
+                yield json.dumps({"message": message, "done": False}) + "\n"
+            done = {
+                "message": {"role": "assistant", "content": ""},
+                "done": True,
+                **prompt_eval,
+                "eval_count": chunks,
+                "eval_duration": int(chunks * cfg.chunk_delay * 1e9),
+            }
+            yield json.dumps(done) + "\n"
+
+        return StreamingResponse(tokens(), media_type="application/x-ndjson")
+
+    @app.post("/api/generate")
+    async def generate(body: dict):
+        # Without a prompt this only loads the model, as in Ollama
+        await load(body)
+        await cfg.wait()
+        if failure := cfg.failed():
+            return failure
+        return {"model": body["model"], "response": "", "done": True}
+
+    @app.get("/api/ps")
+    async def ps() -> dict:
+        return {"models": list(loaded.values())}
+
+    @app.get("/api/tags")
+    async def tags() -> dict:
+        return {"models": [{"name": "llama3:8b-instruct-q4_K_M"}]}
+
+    return app
+
+
+def stt_stub(latency: float = 0.0, config: StubConfig | None = None) -> FastAPI:
+    """STT /api/stt stub that consumes the multipart upload as a stream."""
+    cfg = config or StubConfig(latency=latency)
+    app = FastAPI()
+    _health(app, "/health")
+
+    @app.post("/api/stt")
+    async def stt(request: Request):
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+        await cfg.wait()
+        if failure := cfg.failed():
+            return failure
+        return {"text": "dit is een test", "bytes_received": received}
+
+    return app
+
+
+def tts_stub(config: StubConfig | None = None) -> FastAPI:
+    """TTS stub: /api/tts/synthesize answers WAV bytes in `chunks` pieces."""
+    cfg = config or StubConfig()
+    app = FastAPI()
+    _health(app, "/health")
+    chunk = b"\0" * 16384
+    headers = {"x-tts-engine": "piper"}
+
+    @app.post("/api/tts/synthesize")
+    async def synthesize(body: dict):
+        await cfg.wait()
+        if failure := cfg.failed():
+            return failure
+
+        async def audio():
+            for i in range(cfg.chunks):
+                if i and cfg.chunk_delay:
+                    await asyncio.sleep(cfg.chunk_delay)
+                yield chunk
+
+        return StreamingResponse(audio(), media_type="audio/wav", headers=headers)
+
+    @app.get("/api/tts/engines")
+    async def engines() -> dict:
+        return {"engines": ["piper"]}
+
+    return app
+
+
+def n8n_stub(config: StubConfig | None = None) -> FastAPI:
+    """n8n stub: every POST /webhook/<path> succeeds with a small JSON result."""
+    cfg = config or StubConfig()
+    app = FastAPI()
+    _health(app, "/healthz")
+
+    @app.post("/webhook/{path}")
+    async def webhook(path: str, request: Request):
+        await request.body()
+        await cfg.wait()
+        if failure := cfg.failed():
+            return failure
+        return {"ok": True, "webhook": path}
+
+    return app
+
+
+def whatsapp_stub(config: StubConfig | None = None) -> FastAPI:
+    """whatsapp-web stub with a connected session."""
+    cfg = config or StubConfig()
+    app = FastAPI()
+    _health(app, "/health")
+
+    @app.get("/status")
+    async def status():
+        await cfg.wait()
+        return cfg.failed() or {"ready": True, "hasQr": False}
+
+    @app.get("/contacts")
+    async def contacts():
+        await cfg.wait()
+        return cfg.failed() or [{"name": "Jan", "number": "31600000000"}]
+
+    return app
+
+
+@asynccontextmanager
+async def serve(app: FastAPI, lifespan: str = "auto"):
+    """Serve an app on a free port. Yields its base URL."""
+    port = _free_port()
+    config = uvicorn.Config(
+        app, host="127.0.0.1", port=port, log_level="warning", lifespan=lifespan
+    )
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        await task
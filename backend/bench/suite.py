@@ -0,0 +1,395 @@
+"""End-to-end benchmark of the real app against stubs for every downstream.
+
+Starts stub servers for stt, tts, Ollama, n8n and whatsapp-web, points the
+app at them through its normal environment variables, serves the real
+FastAPI app (lifespan included) on a temporary database, and drives its
+endpoints scenario by scenario. Per scenario it reports p50/p95/p99
+latency, throughput, errors and peak RSS — the median over --repeat runs,
+since a single run is noisy — and compares against a stored baseline JSON;
+a regression beyond --tolerance exits with status 1.
+
+The baseline records the settings it was taken with (--scale, --repeat,
+stub latency and error rate). A run with other settings is reported as not
+comparable and skips the check. Everything runs in one process and event
+loop, so numbers include the stubs' own overhead: the baseline is only
+meaningful on the machine that made it. bench/baseline.json is therefore
+not in git; create it locally with --save-baseline.
+
+Usage (from backend/):
+    python -m bench.suite
+    python -m bench.suite --scenario chat --scenario classify_llm --scale 2
+    python -m bench.suite --latency ollama=0.5 --error-rate 0.05
+    python -m bench.suite --save-baseline
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import AsyncExitStack
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+import httpx
+
+from bench.stubs import (
+    StubConfig,
+    n8n_stub,
+    ollama_stub,
+    serve,
+    stt_stub,
+    tts_stub,
+    whatsapp_stub,
+)
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+DEFAULT_STUBS = {
+    "stt": StubConfig(latency=0.2, jitter=0.05),
+    "tts": StubConfig(latency=0.05, jitter=0.01, chunks=16, chunk_delay=0.005),
+    "ollama": StubConfig(latency=0.1, jitter=0.02, chunks=20, chunk_delay=0.005),
+    "n8n": StubConfig(latency=0.05, jitter=0.01),
+    "whatsapp": StubConfig(latency=0.01),
+}
+
+WAV = b"RIFF" + b"\0" * (1024 * 1024)  # 1 MB upload
+
+
+# --- Scenarios: (method, path, request kwargs builder, requests, concurrency) ---
+
+
+def _article(i: int) -> dict:
+    return {
+        "source": "bench",
+        "title": f"Artikel {i}",
+        "url": f"https://example.org/{i}-{random.random()}",
+        "published_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+SCENARIOS: dict[str, tuple[str, str, Callable[[int], dict], int, int]] = {
+    "stt": ("POST", "/api/stt", lambda i: {"files": {"audio": ("a.wav", WAV, "audio/wav")}}, 40, 4),
+    "classify_fast": (
+        "POST",
+        "/api/classify",
+        lambda i: {"json": {"text": f"stuur een bericht naar Jan dat ik om {i} uur kom"}},
+        400,
+        16,
+    ),
+    "classify_llm": ("POST", "/api/classify", lambda i: {"json": {"text": f"wat vind je van {i}"}}, 100, 8),
+    "chat": (
+        "POST",
+        "/api/chat",
+        lambda i: {"json": {"messages": [{"role": "user", "content": f"hoi {i}"}]}},
+        100,
+        8,
+    ),
+    "chat_stream": (
+        "POST",
+        "/api/chat/stream",
+        lambda i: {"json": {"messages": [{"role": "user", "content": f"hoi {i}"}]}},
+        100,
+        8,
+    ),
+    "tts_stream": (
+        "POST",
+        "/api/tts/synthesize?stream=true",
+        lambda i: {"json": {"text": f"Goedemorgen {i}"}},
+        100,
+        8,
+    ),
+    "flow_execute": (
+        "POST",
+        "/api/flow/execute",
+        lambda i: {
+            "json": {
+                "intent": "whatsapp",
+                "params": {"contact": "Jan", "bericht": f"test {i}"},
+                "source_text": f"stuur Jan test {i}",
+            }
+        },
+        200,
+        16,
+    ),
+    "news_today": ("GET", "/api/news/today", lambda i: {}, 1000, 32),
+    "ingest_article": ("POST", "/api/news/ingest/article", lambda i: {"json": _article(i)}, 300, 8),
+    "ingest_batch": (
+        "POST",
+        "/api/news/ingest/articles",
+        lambda i: {"json": [_article(i * 50 + j) for j in range(50)]},
+        40,
+        4,
+    ),
+}
+
+
+# --- Measurement ---
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+async def _sample_rss(peak: list[int], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        peak[0] = max(peak[0], _rss_bytes())
+        await asyncio.sleep(0.02)
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * q))] * 1000 if samples else 0.0
+
+
+async def run_scenario(client: httpx.AsyncClient, base: str, name: str, scale: float) -> dict:
+    method, path, build, requests, concurrency = SCENARIOS[name]
+    requests = max(1, int(requests * scale))
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            resp = await client.request(method, f"{base}{path}", **build(i))
+            await resp.aread()
+            if resp.status_code >= 400:
+                errors += 1
+        except httpx.HTTPError:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+
+    async def worker() -> None:
+        for i in counter:
+            await one(i)
+
+    # Warm up connections and caches outside the measurement
+    await asyncio.gather(*(one(-i - 1) for i in range(min(concurrency, requests))))
+    latencies.clear()
+    errors = 0
+
+    peak = [_rss_bytes()]
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(_sample_rss(peak, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await sampler
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "p50_ms": round(_percentile(latencies, 0.50), 1),
+        "p95_ms": round(_percentile(latencies, 0.95), 1),
+        "p99_ms": round(_percentile(latencies, 0.99), 1),
+        "throughput_rps": round(requests / elapsed, 1),
+        "peak_rss_mb": round(peak[0] / 2**20, 1),
+    }
+
+
+def median_result(runs: list[dict]) -> dict:
+    """Per-metric median of repeated runs; errors take the worst run."""
+    result = dict(runs[0])
+    for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps", "peak_rss_mb"):
+        result[key] = round(statistics.median(r[key] for r in runs), 1)
+    result["errors"] = max(r["errors"] for r in runs)
+    return result
+
+
+# --- Baseline comparison ---
+
+
+def settings(args: argparse.Namespace, stubs: dict[str, StubConfig]) -> dict:
+    """Run settings that change the numbers; stored with the baseline."""
+    return {
+        "stubs": {name: asdict(cfg) for name, cfg in stubs.items()},
+        "scale": args.scale,
+        "repeat": args.repeat,
+    }
+
+
+def mismatches(saved: dict, current: dict) -> list[str]:
+    """Settings in which a baseline differs from the current run."""
+    problems = [
+        f"{key} {saved.get(key)} vs {current[key]}"
+        for key in ("scale", "repeat")
+        if saved.get(key) != current[key]
+    ]
+    for name, cfg in current["stubs"].items():
+        old = saved.get("stubs", {}).get(name, {})
+        problems += [
+            f"{name} stub {field} {old.get(field)} vs {value}"
+            for field, value in cfg.items()
+            if old.get(field) != value
+        ]
+    return problems
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regressions of results against baseline, as readable lines."""
+    problems = []
+    for name, r in results.items():
+        b = baseline.get(name)
+        if not b:
+            continue
+        if r["p95_ms"] > b["p95_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p95 {b['p95_ms']} -> {r['p95_ms']} ms")
+        if r["throughput_rps"] < b["throughput_rps"] * (1 - tolerance):
+            problems.append(f"{name}: throughput {b['throughput_rps']} -> {r['throughput_rps']} req/s")
+        if r["peak_rss_mb"] > b["peak_rss_mb"] * (1 + tolerance):
+            problems.append(f"{name}: peak RSS {b['peak_rss_mb']} -> {r['peak_rss_mb']} MB")
+        if r["errors"] > b["errors"]:
+            problems.append(f"{name}: errors {b['errors']} -> {r['errors']}")
+    return problems
+
+
+def _delta(value: float, base: float | None) -> str:
+    if not base:
+        return ""
+    return f"({(value - base) / base:+.0%})"
+
+
+# --- Main ---
+
+
+async def main(args: argparse.Namespace) -> int:
+    stubs = {name: StubConfig(**asdict(cfg)) for name, cfg in DEFAULT_STUBS.items()}
+    for spec in args.latency:
+        name, _, seconds = spec.partition("=")
+        stubs[name].latency = float(seconds)
+    for cfg in stubs.values():
+        cfg.error_rate = args.error_rate
+    random.seed(args.seed)
+
+    tmp = tempfile.TemporaryDirectory(prefix="memories-bench-")
+    async with AsyncExitStack() as stack:
+        urls = {
+            "stt": await stack.enter_async_context(serve(stt_stub(config=stubs["stt"]), lifespan="off")),
+            "tts": await stack.enter_async_context(serve(tts_stub(stubs["tts"]), lifespan="off")),
+            "ollama": await stack.enter_async_context(
+                serve(ollama_stub(config=stubs["ollama"]), lifespan="off")
+            ),
+            "n8n": await stack.enter_async_context(serve(n8n_stub(stubs["n8n"]), lifespan="off")),
+            "whatsapp": await stack.enter_async_context(
+                serve(whatsapp_stub(stubs["whatsapp"]), lifespan="off")
+            ),
+        }
+        state = Path(tmp.name, "cleanup_state.json")
+        # A fresh "last run" keeps the retention cleanup away from /data/audio
+        state.write_text(json.dumps({"last_run": datetime.now().astimezone().isoformat()}))
+        os.environ.update(
+            {
+                "DATABASE_URL": f"sqlite+aiosqlite:///{tmp.name}/bench.db",
+                "CLEANUP_STATE_PATH": str(state),
+                "STT_URL": f"{urls['stt']}/api/stt",
+                "STT_HEALTH_URL": f"{urls['stt']}/health",
+                "TTS_URL": f"{urls['tts']}/api/tts",
+                "TTS_HEALTH_URL": f"{urls['tts']}/health",
+                "OLLAMA_BASE_URL": urls["ollama"],
+                "N8N_WEBHOOK_URL": urls["n8n"],
+                "N8N_HEALTH_URL": f"{urls['n8n']}/healthz",
+                "WHATSAPP_BASE_URL": urls["whatsapp"],
+                "WHATSAPP_HEALTH_URL": f"{urls['whatsapp']}/health",
+            }
+        )
+        # Imported only now: the app reads its configuration at import time
+        from app.main import app
+        from app.services.flow_worker import queue_size
+
+        base = await stack.enter_async_context(serve(app))
+        client = await stack.enter_async_context(
+            httpx.AsyncClient(timeout=120, limits=httpx.Limits(max_connections=64))
+        )
+        names = args.scenario or list(SCENARIOS)
+        results = {}
+        for name in names:
+            runs = []
+            for _ in range(args.repeat):
+                runs.append(await run_scenario(client, base, name, args.scale))
+                # Queued flow executions would otherwise run into the next run
+                while queue_size():
+                    await asyncio.sleep(0.05)
+            results[name] = median_result(runs)
+
+    tmp.cleanup()
+
+    current = settings(args, stubs)
+    baseline = {}
+    not_comparable = []
+    if args.baseline.exists() and not args.save_baseline:
+        saved = json.loads(args.baseline.read_text())
+        not_comparable = mismatches(saved, current)
+        if not not_comparable:
+            baseline = saved["results"]
+
+    print(
+        f"{'scenario':<15} {'req':>5} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        f" {'req/s':>8} {'RSS MB':>7}  vs baseline (p95, req/s)"
+    )
+    for name, r in results.items():
+        b = baseline.get(name, {})
+        print(
+            f"{name:<15} {r['requests']:>5} {r['errors']:>4} {r['p50_ms']:>8} {r['p95_ms']:>8}"
+            f" {r['p99_ms']:>8} {r['throughput_rps']:>8} {r['peak_rss_mb']:>7}"
+            f"  {_delta(r['p95_ms'], b.get('p95_ms'))} {_delta(r['throughput_rps'], b.get('throughput_rps'))}"
+        )
+
+    if args.save_baseline:
+        args.baseline.write_text(
+            json.dumps(
+                {**current, "results": results},
+                indent=2,
+            )
+            + "\n"
+        )
+        print(f"\nbaseline written to {args.baseline}")
+        return 0
+
+    if not_comparable:
+        print(f"\nnot comparable with {args.baseline}, no regression check:")
+        for line in not_comparable:
+            print(f"  {line}")
+        print("  run with the baseline's settings, or save a new one with --save-baseline")
+        return 0
+    if not args.baseline.exists():
+        print(f"\nno baseline at {args.baseline}; create one with --save-baseline")
+        return 0
+
+    problems = compare(results, baseline, args.tolerance)
+    if problems:
+        print(f"\nregressions beyond {args.tolerance:.0%}:")
+        for line in problems:
+            print(f"  {line}")
+        return 1
+    if baseline:
+        print(f"\nno regressions beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end benchmark against stub services")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="repeatable")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply request counts")
+    parser.add_argument("--latency", action="append", default=[], metavar="SERVICE=SECONDS")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 share for every stub")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario (median)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    sys.exit(asyncio.run(main(parser.parse_args())))
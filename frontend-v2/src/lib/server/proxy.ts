@@ -18,6 +18,12 @@ function respond(resp: Response, opts?: Opts): Response {
 	const h: Record<string, string> = {
 		'content-type': resp.headers.get('content-type') ?? 'application/json'
 	};
+	// Validators and range headers, so browsers can revalidate (304) and seek (206);
+	// server-timing shows the backend's breakdown in devtools
+	for (const k of ['etag', 'cache-control', 'accept-ranges', 'content-range', 'content-length', 'server-timing']) {
+		const v = resp.headers.get(k);
+		if (v) h[k] = v;
+	}
 	if (opts?.headers) Object.assign(h, opts.headers);
 	if (opts?.forwardXHeaders) {
 		resp.headers.forEach((v, k) => {
@@ -28,8 +34,13 @@ function respond(resp: Response, opts?: Opts): Response {
 }
 
 export function proxyGet(path: string, opts?: Opts) {
-	return async ({ params }: Event) => {
-		const resp = await fetch(`${BACKEND}${resolve(path, params)}`);
+	return async ({ request, params }: Event) => {
+		const headers: Record<string, string> = {};
+		for (const k of ['if-none-match', 'range', 'if-range']) {
+			const v = request.headers.get(k);
+			if (v) headers[k] = v;
+		}
+		const resp = await fetch(`${BACKEND}${resolve(path, params)}`, { headers });
 		return respond(resp, opts);
 	};
 }
@@ -0,0 +1,5 @@
+import { proxyGet } from '$lib/server/proxy';
+
+export const GET = proxyGet('/api/flow/status/[id]/events', {
+	headers: { 'cache-control': 'no-cache' }
+});
@@ -0,0 +1,3 @@
+import { proxyGet } from '$lib/server/proxy';
+
+export const GET = proxyGet('/api/news/briefing');
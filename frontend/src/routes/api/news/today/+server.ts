@@ -1,11 +1,17 @@
 import { BACKEND } from '$lib/server/backend';
 import type { RequestHandler } from './$types';
 
-export const GET: RequestHandler = async () => {
-	const resp = await fetch(`${BACKEND}/api/news/today`);
+export const GET: RequestHandler = async ({ request }) => {
+	const inm = request.headers.get('if-none-match');
+	const resp = await fetch(`${BACKEND}/api/news/today`, {
+		headers: inm ? { 'if-none-match': inm } : {}
+	});
 
+	const headers: Record<string, string> = { 'content-type': 'application/json' };
+	const etag = resp.headers.get('etag');
+	if (etag) headers['etag'] = etag;
 	return new Response(resp.body, {
 		status: resp.status,
-		headers: { 'content-type': 'application/json' }
+		headers: { ...headers, 'cache-control': 'no-cache' }
 	});
 };